@@ -0,0 +1,8 @@
+"""○×ゲームのゲームロジック（Pygameに依存しない部分）"""
+
+from marubatsu.board import (
+    Board, GridBoard, make_board, opponent, PLAYER_MARU, PLAYER_BATSU, LINE_NAMES, WIN_MASKS,
+)
+
+__all__ = ["Board", "GridBoard", "make_board", "opponent", "PLAYER_MARU", "PLAYER_BATSU", "LINE_NAMES",
+           "WIN_MASKS"]
@@ -0,0 +1,169 @@
+"""対戦記録の集計（メモリマップと NumPy）
+
+ログファイルをメモリマップし、固定長レコードを NumPy の構造化配列として
+一定件数ずつ取り出してまとめて解読する。集計は
+(モード, cpu_level, 先手, 最初の手) ごとの勝敗の数を数える固定の大きさの
+配列に np.bincount で足し込むので、ログがいくら大きくても使うメモリは
+チャンク1つぶんで済む。
+
+    python -m maru_batsu_game analyze --by cpu_level first
+    python -m maru_batsu_game analyze --by opening --mode cpu --cpu-level 2
+"""
+
+import argparse
+import mmap
+
+import numpy as np
+
+from marubatsu.board import PLAYER_MARU
+from marubatsu.records import (
+    COUNT_SHIFT, CPU_LEVEL_SHIFT, FIRST_SHIFT, HEADER, LOG_DIR, MODE_CPU, MODE_HUMAN,
+    MODE_SELF_PLAY, MODE_SHIFT, RECORD, WINNER_SHIFT, check_header, log_files,
+)
+
+# ログファイルのレコード（records.RECORD と同じ並び）
+RECORD_DTYPE = np.dtype([("bits", "<u8"), ("timestamp", "<u4")])
+
+# 解読したレコード
+GAME_DTYPE = np.dtype([
+    ("mode", "u1"),
+    ("cpu_level", "u1"),
+    ("first", "u1"),  # 0: ○が先手, 1: ×が先手
+    ("opening", "u1"),  # 最初に打たれたマス（手がなければ 9）
+    ("moves", "u1"),  # 手数
+    ("result", "u1"),  # 先手から見た 0: 勝ち, 1: 引き分け, 2: 負け
+    ("timestamp", "<u4"),
+])
+
+# 一度に解読するレコード数
+CHUNK_RECORDS = 1 << 20
+
+# 集計に使う項目と、その値の数（集計の配列の軸の順）
+GROUPS = {"mode": 4, "cpu_level": 8, "first": 2, "opening": 10}
+OUTCOMES = 3
+
+MODE_OPTIONS = {"human": MODE_HUMAN, "cpu": MODE_CPU, "self-play": MODE_SELF_PLAY}
+MODE_LABELS = {MODE_HUMAN: "human", MODE_CPU: "cpu", MODE_SELF_PLAY: "self-play"}
+
+
+def decode(records):
+    """RECORD_DTYPE の配列を GAME_DTYPE の配列に解読する"""
+    bits = records["bits"]
+    games = np.empty(len(records), dtype=GAME_DTYPE)
+    games["mode"] = bits >> MODE_SHIFT & 0x3
+    games["cpu_level"] = bits >> CPU_LEVEL_SHIFT & 0x7
+    games["first"] = bits >> FIRST_SHIFT & 1
+    count = bits >> COUNT_SHIFT & 0xF
+    games["moves"] = count
+    games["opening"] = np.where(count > 0, bits & 0xF, 9)
+
+    # 勝者 (0: 引き分け, 1: ○, 2: ×) を先手から見た勝敗にする
+    winner = (bits >> WINNER_SHIFT & 0x3).astype(np.uint8)
+    first_player = games["first"] + PLAYER_MARU
+    games["result"] = np.where(winner == 0, 1, np.where(winner == first_player, 0, 2))
+    games["timestamp"] = records["timestamp"]
+    return games
+
+
+def iter_chunks(paths, chunk_records=CHUNK_RECORDS):
+    """ログファイルをメモリマップし、解読したレコードを chunk_records 件ずつ yield する
+
+    書きかけで途中までしかないレコードは読み飛ばす。
+    """
+    for path in paths:
+        with open(path, "rb") as f:
+            check_header(f.read(HEADER.size), path)
+            f.seek(0, 2)
+            if f.tell() == HEADER.size:
+                continue
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                total = (len(mapped) - HEADER.size) // RECORD.size
+                for start in range(0, total, chunk_records):
+                    count = min(chunk_records, total - start)
+                    records = np.frombuffer(mapped, dtype=RECORD_DTYPE, count=count,
+                                            offset=HEADER.size + start * RECORD.size)
+                    games = decode(records)
+                    # mmap を閉じる前にビューを手放す
+                    del records
+                    yield games
+
+
+def count_outcomes(chunks, mode=None, cpu_level=None):
+    """(モード, cpu_level, 先手, 最初の手, 勝敗) ごとのゲーム数の配列を返す
+
+    mode と cpu_level を指定すると、そのゲームだけを数える。
+    """
+    shape = tuple(GROUPS.values()) + (OUTCOMES,)
+    counts = np.zeros(shape, dtype=np.int64)
+    for games in chunks:
+        if mode is not None:
+            games = games[games["mode"] == mode]
+        if cpu_level is not None:
+            games = games[games["cpu_level"] == cpu_level]
+        index = np.ravel_multi_index(
+            (games["mode"], games["cpu_level"], games["first"], games["opening"], games["result"]),
+            shape)
+        counts += np.bincount(index, minlength=counts.size).reshape(shape)
+    return counts
+
+
+def group_counts(counts, by):
+    """by の項目ごとにまとめた [(値のタプル, (勝ち, 引き分け, 負け))] を返す（ゲームがある組だけ）"""
+    axes = list(GROUPS)
+    summed = counts.sum(axis=tuple(axes.index(name) for name in GROUPS if name not in by))
+    # summed の軸は GROUPS の順なので、by の順に並べ替える
+    kept = [name for name in GROUPS if name in by]
+    summed = np.moveaxis(summed, [kept.index(name) for name in by], range(len(by)))
+    rows = []
+    for key in np.ndindex(*summed.shape[:-1]):
+        outcome = summed[key]
+        if outcome.sum():
+            rows.append((key, tuple(int(count) for count in outcome)))
+    return rows
+
+
+def _label(name, value):
+    if name == "mode":
+        return MODE_LABELS.get(value, str(value))
+    if name == "first":
+        return "○" if value == 0 else "×"
+    if name == "opening":
+        return "-" if value == 9 else str(value)
+    return str(value)
+
+
+def format_table(by, rows):
+    """集計結果の表の文字列"""
+    width = 10
+    lines = ["".join(name.ljust(width) for name in by) + "games".rjust(10)
+             + "first-win".rjust(11) + "draw".rjust(8) + "first-loss".rjust(12)]
+    for key, (wins, draws, losses) in rows:
+        total = wins + draws + losses
+        lines.append("".join(_label(name, value).ljust(width) for name, value in zip(by, key))
+                     + f"{total:10d}{wins / total:11.1%}{draws / total:8.1%}{losses / total:12.1%}")
+    lines.append("（勝敗は先手から見たもの。×が先手のCPU戦では先手はCPU）")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="maru_batsu_game analyze",
+                                     description="対戦記録をまとめて集計する")
+    parser.add_argument("--dir", default=LOG_DIR, help="ログファイルのディレクトリ")
+    parser.add_argument("--by", nargs="+", choices=GROUPS, default=["mode", "cpu_level", "first"],
+                        help="集計に使う項目")
+    parser.add_argument("--mode", choices=MODE_OPTIONS, default=None, help="このモードのゲームだけ数える")
+    parser.add_argument("--cpu-level", type=int, default=None, help="この cpu_level のゲームだけ数える")
+    parser.add_argument("--chunk", type=int, default=CHUNK_RECORDS, help="一度に解読するレコード数")
+    args = parser.parse_args(argv)
+
+    paths = log_files(args.dir)
+    if not paths:
+        parser.error(f"対戦記録がありません: {args.dir}")
+    if len(set(args.by)) != len(args.by):
+        parser.error("--by に同じ項目が重なっています")
+
+    mode = MODE_OPTIONS[args.mode] if args.mode else None
+    counts = count_outcomes(iter_chunks(paths, args.chunk), mode, args.cpu_level)
+    print(format_table(args.by, group_counts(counts, args.by)))
+    print(f"{int(counts.sum())} games in {len(paths)} files")
+    return 0
@@ -0,0 +1,941 @@
+"""○×ゲームの画面（Pygame）"""
+
+import argparse
+import pygame
+import sys
+
+from marubatsu.assets import AssetManager
+from marubatsu.board import PLAYER_MARU, PLAYER_BATSU
+from marubatsu.client import LineClient, parse_address
+from marubatsu.game import GameState, MaruBatsuGame, VARIANTS
+from marubatsu.layout import Layout
+from marubatsu.profiler import FrameProfiler
+from marubatsu.records import GameLogWriter
+from marubatsu.server import DEFAULT_PORT
+from marubatsu.text_cache import LabelCache
+from marubatsu.win_lines import WinLineRenderer
+from marubatsu.worker import SearchWorker
+
+# 画面設定（起動時のウィンドウの大きさ。配置は marubatsu/layout.py で拡大縮小する）
+WIDTH, HEIGHT = 800, 600
+
+# 色の定義
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+RED = (255, 0, 0)
+BLUE = (0, 0, 255)
+GREEN = (0, 128, 0)
+YELLOW = (255, 215, 0)
+GRAY = (200, 200, 200)
+
+# 画面・フォント（init() で設定する）
+screen = None
+default_font = None
+large_font = None
+title_font = None
+font_scale = None  # フォントを用意したときの倍率
+
+# 全画面表示から戻るときのウィンドウの大きさ
+windowed_size = (WIDTH, HEIGHT)
+
+# 画像（最初に描画するときに読み込む）
+assets = AssetManager()
+
+# 文字列サーフェスのキャッシュ
+label_cache = LabelCache(maxsize=64)
+
+# 変化した領域を1つずつ描き直す最大の数（これより多ければ全体を囲む1つの領域で描く）
+DIRTY_REGION_LIMIT = 8
+
+# 勝利ラインが伸びきるまでの時間（ミリ秒）
+WIN_LINE_DURATION = 300
+
+# ネットワークからメッセージが届いたことを知らせるイベント（眠っているループを起こす）
+NETWORK_EVENT = pygame.event.custom_type()
+
+# 全画面表示を切り替えるキー
+FULLSCREEN_KEY = pygame.K_F11
+
+# 待った（Ctrl+Z）・やり直し（Ctrl+Y か Ctrl+Shift+Z）と、1手ずつ履歴を動かすキー
+UNDO_KEY = pygame.K_z
+REDO_KEY = pygame.K_y
+HISTORY_BACK_KEY = pygame.K_LEFT
+HISTORY_FORWARD_KEY = pygame.K_RIGHT
+HISTORY_START_KEY = pygame.K_HOME
+HISTORY_END_KEY = pygame.K_END
+# Ctrl の代わりに Mac の Command キーでもよい
+SHORTCUT_MODS = pygame.KMOD_CTRL | pygame.KMOD_META
+
+# 履歴のバーに1手ごとの目盛りを描く最大の手数（これより多いと目盛りが詰まりすぎる）
+HISTORY_TICKS_MAX = 40
+
+# 計測結果の表示を切り替えるキーと、表示を書き換える間隔（ミリ秒）
+PROFILER_KEY = pygame.K_F3
+PROFILER_REFRESH = 250
+
+def init(fullscreen=False):
+    """Pygameを初期化し、画面とフォントを用意する"""
+    global screen
+    
+    # Pygameの初期化
+    pygame.init()
+    
+    # 画面設定（ウィンドウの大きさは変えられる）
+    if fullscreen:
+        screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+    else:
+        screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
+    pygame.display.set_caption("○×ゲーム")
+    
+    # フォント設定
+    load_fonts()
+    return screen
+
+def load_fonts(scale=1.0):
+    """画面の倍率に合わせてフォントを用意する"""
+    global default_font, large_font, title_font, font_scale
+    if scale == font_scale:
+        return
+    default_font = pygame.font.SysFont(None, max(8, round(24 * scale)))
+    large_font = pygame.font.SysFont(None, max(8, round(32 * scale)))
+    title_font = pygame.font.SysFont(None, max(8, round(48 * scale)))
+    font_scale = scale
+
+def toggle_fullscreen():
+    """全画面表示とウィンドウ表示を切り替え、新しい画面を返す"""
+    global screen, windowed_size
+    if screen.get_flags() & pygame.FULLSCREEN:
+        screen = pygame.display.set_mode(windowed_size, pygame.RESIZABLE)
+    else:
+        windowed_size = screen.get_size()
+        screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+    return screen
+
+# ゲーム画面クラス
+class MaruBatsuApp(MaruBatsuGame):
+    def __init__(self, seed=None):
+        # CPUの探索は別スレッドで行い、描画を止めない
+        # 終わったゲームは logs/ に記録する
+        super().__init__(get_ticks=pygame.time.get_ticks, search_worker=SearchWorker(),
+                         recorder=GameLogWriter(), seed=seed)
+        
+        # 勝利ラインの描画と、アニメーションを始めた時間
+        self.win_line_renderer = WinLineRenderer(GREEN)
+        self.win_line_start_time = None
+        
+        # 前回描画したときにアニメーションの途中だったか
+        self.animating = False
+        
+        # ボタンなどの位置を画面の大きさに合わせて決める
+        self.resize((WIDTH, HEIGHT))
+    
+    def resize(self, size):
+        """画面の大きさに合わせて配置を計算し直す（拡大縮小した画像も作り直させる）"""
+        layout = self.layout = Layout(size)
+        
+        # リスタートボタンの位置
+        self.restart_button_rect = layout.rect(300, 500, 200, 50)
+        
+        # ホームボタンの位置
+        self.home_button_rect = layout.rect(680, 20, 100, 40)
+        
+        # モード選択ボタンの位置
+        self.vs_player_button_rect = layout.rect(250, 300, 140, 50)
+        self.vs_cpu_button_rect = layout.rect(410, 300, 140, 50)
+        
+        # CPU難易度選択ボタンの位置（上の段が 1〜3、下の段が 4〜6）
+        self.easy_button_rect = layout.rect(235, 410, 100, 45)
+        self.hard_button_rect = layout.rect(350, 410, 100, 45)
+        self.perfect_button_rect = layout.rect(465, 410, 100, 45)
+        self.mcts_button_rect = layout.rect(235, 462, 100, 45)
+        self.alphabeta_button_rect = layout.rect(350, 462, 100, 45)
+        self.learned_button_rect = layout.rect(465, 462, 100, 45)
+        # (cpu_level, ボタンの領域, 表示名)
+        self.level_buttons = (
+            (1, self.easy_button_rect, "簡単"),
+            (2, self.hard_button_rect, "難しい"),
+            (3, self.perfect_button_rect, "最強"),
+            (4, self.mcts_button_rect, "MCTS"),
+            (5, self.alphabeta_button_rect, "αβ探索"),
+            (6, self.learned_button_rect, "学習"),
+        )
+        
+        # 盤の種類の切り替えボタンの位置
+        self.variant_button_rect = layout.rect(310, 520, 180, 40)
+        
+        # 履歴のバーと、つまみと「何手目」の表示を含めた領域
+        self.history_rect = layout.rect(250, 568, 300, 16)
+        self.history_area_rect = layout.rect(230, 552, 460, 48)
+        
+        # 手番・結果・「考え中」の表示領域（横は画面の端から端まで）
+        status = layout.rect(0, 80, 800, 75)
+        self.status_rect = pygame.Rect(0, status.y, layout.size[0], status.height)
+        
+        # マウスが乗っているボタン
+        self.hover_rect = None
+        
+        # 履歴のバーのつまみをドラッグ中か
+        self.scrubbing = False
+        
+        # 組み立て済みのタイトル画面 (vs_cpu, cpu_level, 盤の大きさ, 並び数) -> Surface
+        self.title_screens = {}
+        
+        # 画像とフォントは大きさが変わったときだけ作り直す
+        assets.clear_scaled()
+        if pygame.font.get_init():
+            load_fonts(layout.scale)
+        
+        # 前回描画したときの状態（None なら画面全体を描き直す）
+        self.drawn_view = None
+    
+    @property
+    def grid(self):
+        """今の盤のグリッドとマスの位置"""
+        return self.layout.grid(self.board.size)
+    
+    @property
+    def grid_rect(self):
+        """グリッドの領域"""
+        return self.grid.rect
+    
+    @property
+    def cell_size(self):
+        """1マスの大きさ（グリッドの大きさを盤のマス数で割ったもの）"""
+        return self.grid.cell_size
+    
+    def cell_rect(self, cell):
+        """マスの領域"""
+        return self.grid.cells[cell]
+    
+    def next_variant(self):
+        """盤の種類を次のものに切り替える"""
+        variant = (self.board.size, self.board.win_length)
+        index = VARIANTS.index(variant) if variant in VARIANTS else -1
+        self.set_variant(*VARIANTS[(index + 1) % len(VARIANTS)])
+    
+    def visible_buttons(self):
+        """現在の画面に表示されているボタンの領域"""
+        if self.state == GameState.TITLE:
+            buttons = [self.vs_player_button_rect, self.vs_cpu_button_rect, self.variant_button_rect]
+            if self.vs_cpu:
+                buttons += [rect for _, rect, _ in self.level_buttons]
+            return buttons
+        if self.state == GameState.GAME_OVER:
+            return [self.home_button_rect, self.restart_button_rect]
+        return [self.home_button_rect]
+    
+    def status_message(self):
+        """手番の下に出す一言（なければ None）"""
+        if self.vs_cpu and self.cpu_thinking:
+            return "CPUが考え中..."
+        if self.vs_cpu and self.current_player == PLAYER_BATSU and self.undone_moves:
+            return "履歴を表示中（→ で進む）"
+        return None
+    
+    def shows_history(self):
+        """履歴のバーを出すか（待ったもやり直しもできないときは出さず、クリックも受け付けない）"""
+        return self.can_undo() or self.can_redo()
+    
+    def history_length(self):
+        """履歴の手数（打った手と、待ったで戻した手）"""
+        return len(self.moves) + len(self.undone_moves)
+    
+    def history_index_at(self, x):
+        """履歴のバーの横の位置 x に一番近い手数"""
+        rect = self.history_rect
+        total = self.history_length()
+        return min(total, max(0, round((x - rect.x) * total / rect.width)))
+    
+    def update(self):
+        """ゲーム状態の更新"""
+        super().update()
+        
+        # 勝利ラインが決まったらアニメーションを始める
+        if self.winning_line is None:
+            self.win_line_start_time = None
+        elif self.win_line_start_time is None:
+            self.win_line_start_time = self.get_ticks()
+    
+    def next_update_in(self):
+        """次に update() と描画が必要になるまでの時間（アニメーション中は 0）"""
+        if self.animating:
+            return 0
+        return super().next_update_in()
+    
+    def win_line_progress(self):
+        """勝利ラインの伸び具合（0〜1）"""
+        if self.win_line_start_time is None:
+            return 1.0
+        return min(1.0, (self.get_ticks() - self.win_line_start_time) / WIN_LINE_DURATION)
+    
+    def win_line_rect(self, cells):
+        """勝利ラインを描く領域（揃ったマス全体を含める）
+
+        領域の端が駒の線の途中を切ると、クリップされた太い線は端の画素が変わってしまう。
+        マスの境目で切れば駒には掛からない。
+        """
+        bounds = self.win_line_renderer.bounds(cells, self.board.size, self.cell_size)
+        return bounds.move(self.grid_rect.topleft).unionall([self.cell_rect(cell) for cell in cells])
+    
+    def view(self):
+        """画面に映る状態（変化した部分だけを描き直すために使う）"""
+        win_line = None
+        if self.winning_line:
+            win_line = (self.winning_line, self.win_line_renderer.step(self.win_line_progress()))
+        return (self.state, self.vs_cpu, (self.cpu_level, self.board.size, self.board.win_length),
+                self.board.maru, self.board.batsu,
+                self.current_player, self.status_message(), self.winner, win_line,
+                self.hover_rect, self.shows_history() and (len(self.moves), len(self.undone_moves)))
+    
+    def invalidate(self):
+        """次のフレームで画面全体を描き直す"""
+        self.drawn_view = None
+    
+    def dirty_rects(self):
+        """前回の描画から変化した領域のリスト（変化がなければ空）"""
+        old = self.drawn_view
+        new = self.view()
+        if old == new:
+            return []
+        if old is None or old[:3] != new[:3]:
+            # 画面の切り替えや難易度の変更は全体を描き直す
+            return [pygame.Rect((0, 0), self.layout.size)]
+        
+        rects = []
+        old_maru, old_batsu = old[3], old[4]
+        changed = (old_maru ^ new[3]) | (old_batsu ^ new[4])
+        while changed:
+            cell = (changed & -changed).bit_length() - 1
+            rects.append(self.cell_rect(cell))
+            changed &= changed - 1
+        if old[5:8] != new[5:8]:
+            rects.append(self.status_rect)
+        if old[8] != new[8]:
+            lines = {win_line[0] for win_line in (old[8], new[8]) if win_line}
+            rects.extend(self.win_line_rect(cells) for cells in lines)
+        if old[9] != new[9]:
+            for hover_rect in (old[9], new[9]):
+                if hover_rect:
+                    rects.append(hover_rect.inflate(self.layout.px(8), self.layout.px(8)))
+        if old[10] != new[10]:
+            rects.append(self.history_area_rect)
+        return rects
+    
+    def render(self, screen):
+        """変化した領域だけを描き直し、その領域のリストを返す
+
+        領域ごとにクリップして draw() を呼ぶので、描くのはその領域に掛かる部品だけになる。
+        """
+        rects = self.dirty_rects()
+        if rects:
+            regions = rects if len(rects) <= DIRTY_REGION_LIMIT else [rects[0].unionall(rects[1:])]
+            for rect in regions:
+                screen.set_clip(rect)
+                self.draw(screen)
+            screen.set_clip(None)
+            self.drawn_view = self.view()
+        # 伸びきった勝利ラインを描くまではフレームを進め続ける
+        self.animating = self.win_line_progress() < 1.0
+        return rects
+    
+    def handle_event(self, event):
+        """イベント処理"""
+        if event.type == pygame.MOUSEMOTION:
+            self.hover_rect = None
+            for rect in self.visible_buttons():
+                if rect.collidepoint(event.pos):
+                    self.hover_rect = rect
+                    break
+            # 履歴のバーのつまみをドラッグしている間は、その位置の手まで動かす
+            if self.scrubbing:
+                self.seek(self.history_index_at(event.pos[0]))
+        
+        if event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            self.scrubbing = False
+        
+        if event.type == pygame.KEYDOWN and self.state != GameState.TITLE:
+            self.handle_history_key(event)
+            return
+        
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            # マウスクリック処理
+            # ホームボタン（どの画面からでもタイトルに戻れる）
+            if self.home_button_rect.collidepoint(event.pos) and self.state != GameState.TITLE:
+                self.cancel_cpu()
+                self.state = GameState.TITLE
+                return
+            
+            # 履歴のバー（クリックした位置の手まで戻す・進める）
+            if (self.shows_history()
+                    and self.history_rect.inflate(0, self.history_rect.height).collidepoint(event.pos)):
+                self.scrubbing = True
+                self.seek(self.history_index_at(event.pos[0]))
+                return
+                
+            if self.state == GameState.TITLE:
+                # VS プレイヤーボタン
+                if self.vs_player_button_rect.collidepoint(event.pos):
+                    self.vs_cpu = False
+                    self.reset_game()
+                
+                # VS CPUボタン
+                elif self.vs_cpu_button_rect.collidepoint(event.pos):
+                    self.vs_cpu = True
+                    self.reset_game()
+                
+                # 盤の種類の切り替えボタン
+                elif self.variant_button_rect.collidepoint(event.pos):
+                    self.next_variant()
+                
+                # 難易度選択ボタン（CPUモードのみ）
+                elif self.vs_cpu:
+                    for level, rect, _ in self.level_buttons:
+                        if rect.collidepoint(event.pos):
+                            self.cpu_level = level
+                            break
+            
+            elif self.state == GameState.PLAYING:
+                # CPUが考え中の場合と、履歴でCPUの番を見ている場合はクリックを無視
+                if self.vs_cpu and (self.cpu_thinking or self.current_player == PLAYER_BATSU and self.undone_moves):
+                    return
+                    
+                # グリッド内のクリック（描画と同じマスの位置で判定する）
+                cell = self.grid.cell_at(event.pos)
+                if cell is not None:
+                    self.make_move(*self.board.position(cell))
+            
+            elif self.state == GameState.GAME_OVER:
+                # リスタートボタン
+                if self.restart_button_rect.collidepoint(event.pos):
+                    # タイトル画面に戻らずに直接ゲームをリセット
+                    self.reset_game()
+    
+    def handle_history_key(self, event):
+        """待った・やり直しと、履歴を動かすキー"""
+        if event.mod & SHORTCUT_MODS:
+            if event.key == UNDO_KEY and event.mod & pygame.KMOD_SHIFT or event.key == REDO_KEY:
+                self.redo_turn()
+            elif event.key == UNDO_KEY:
+                self.take_back()
+        elif event.key == HISTORY_BACK_KEY:
+            self.undo()
+        elif event.key == HISTORY_FORWARD_KEY:
+            self.redo()
+        elif event.key == HISTORY_START_KEY:
+            self.seek(0)
+        elif event.key == HISTORY_END_KEY:
+            self.seek(self.history_length())
+    
+    def title_screen(self):
+        """タイトル画面の画像（選択状態ごとに一度だけ組み立てる）"""
+        key = (self.vs_cpu, self.cpu_level, self.board.size, self.board.win_length)
+        surface = self.title_screens.get(key)
+        if surface is None:
+            surface = pygame.Surface(self.layout.size).convert()
+            self.draw_title(surface)
+            self.title_screens[key] = surface
+        return surface
+    
+    def draw_title(self, screen):
+        """タイトル画面を描画"""
+        layout = self.layout
+        radius = layout.px(10)
+        border = layout.px(2)
+        
+        # 背景を描画
+        background_img = assets.background(layout.size)
+        if background_img:
+            screen.blit(background_img, (0, 0))
+        else:
+            screen.fill(WHITE)
+        
+        title_img = assets.get("title")
+        if title_img:
+            title_img = assets.scaled("title", layout.rect(0, 0, *title_img.size).size)
+            title_rect = title_img.get_rect(center=layout.point(400, 150))
+            title_img.blit(screen, title_rect.topleft)
+        else:
+            title_text = label_cache.render(title_font, "○×ゲーム", BLACK)
+            title_rect = title_text.get_rect(center=layout.point(400, 150))
+            screen.blit(title_text, title_rect)
+        
+        # モード選択テキスト
+        mode_text = label_cache.render(large_font, "モードを選択してください", BLACK)
+        mode_rect = mode_text.get_rect(center=layout.point(400, 250))
+        screen.blit(mode_text, mode_rect)
+        
+        # VS プレイヤーボタン
+        pygame.draw.rect(screen, BLUE, self.vs_player_button_rect, border_radius=radius)
+        pygame.draw.rect(screen, BLACK, self.vs_player_button_rect, border, border_radius=radius)
+        vs_player_text = label_cache.render(default_font, "対人戦", WHITE)
+        vs_player_rect = vs_player_text.get_rect(center=self.vs_player_button_rect.center)
+        screen.blit(vs_player_text, vs_player_rect)
+        
+        # VS CPUボタン
+        pygame.draw.rect(screen, RED, self.vs_cpu_button_rect, border_radius=radius)
+        pygame.draw.rect(screen, BLACK, self.vs_cpu_button_rect, border, border_radius=radius)
+        vs_cpu_text = label_cache.render(default_font, "CPU戦", WHITE)
+        vs_cpu_rect = vs_cpu_text.get_rect(center=self.vs_cpu_button_rect.center)
+        screen.blit(vs_cpu_text, vs_cpu_rect)
+        
+        # 盤の種類の切り替えボタン
+        pygame.draw.rect(screen, GRAY, self.variant_button_rect, border_radius=radius)
+        pygame.draw.rect(screen, BLACK, self.variant_button_rect, border, border_radius=radius)
+        size, win_length = self.board.size, self.board.win_length
+        variant_text = label_cache.render(default_font, f"{size}×{size}・{win_length}目並べ", BLACK)
+        variant_rect = variant_text.get_rect(center=self.variant_button_rect.center)
+        screen.blit(variant_text, variant_rect)
+        
+        # CPU難易度選択（CPUモードのみ）
+        if self.vs_cpu:
+            difficulty_text = label_cache.render(default_font, "難易度を選択", BLACK)
+            difficulty_rect = difficulty_text.get_rect(center=layout.point(400, 390))
+            screen.blit(difficulty_text, difficulty_rect)
+            
+            # 難易度ボタン（選んでいるものは緑）
+            for level, rect, label in self.level_buttons:
+                color = GREEN if self.cpu_level == level else GRAY
+                pygame.draw.rect(screen, color, rect, border_radius=radius)
+                pygame.draw.rect(screen, BLACK, rect, border, border_radius=radius)
+                level_text = label_cache.render(default_font, label, WHITE)
+                level_rect = level_text.get_rect(center=rect.center)
+                screen.blit(level_text, level_rect)
+    
+    def draw(self, screen):
+        """描画処理
+
+        画面のクリップ領域（render() が変化した領域に設定する）に掛からない部品は描かない。
+        駒はクリップ領域に掛かるマスだけを調べるので、1マス変わったときは盤の大きさによらず
+        そのマスの分だけ描けばよい。
+        """
+        clip = screen.get_clip()
+        if self.state == GameState.TITLE:
+            # タイトル画面（組み立て済みの画像から、クリップ領域の分だけ写す）
+            screen.blit(self.title_screen(), clip.topleft, clip)
+        
+        elif self.state == GameState.PLAYING or self.state == GameState.GAME_OVER:
+            layout = self.layout
+            radius = layout.px(10)
+            border = layout.px(2)
+            
+            # 背景を描画
+            background_img = assets.background(layout.size)
+            if background_img:
+                screen.blit(background_img, clip.topleft, clip)
+            else:
+                screen.fill(WHITE, clip)
+            
+            # ホームボタン
+            if clip.colliderect(self.home_button_rect):
+                pygame.draw.rect(screen, BLUE, self.home_button_rect, border_radius=radius)
+                pygame.draw.rect(screen, BLACK, self.home_button_rect, border, border_radius=radius)
+                home_text = label_cache.render(default_font, "ホーム", WHITE)
+                home_rect = home_text.get_rect(center=self.home_button_rect.center)
+                screen.blit(home_text, home_rect)
+            
+            size = self.board.size
+            cell_size = self.cell_size
+            grid_rect = self.grid_rect
+            # クリップ領域に掛かるマスの行と列の範囲（掛からなければ空）
+            visible = clip.clip(grid_rect)
+            if visible:
+                rows = range((visible.top - grid_rect.y) // cell_size,
+                             (visible.bottom - 1 - grid_rect.y) // cell_size + 1)
+                cols = range((visible.left - grid_rect.x) // cell_size,
+                             (visible.right - 1 - grid_rect.x) // cell_size + 1)
+            else:
+                rows = cols = range(0)
+            
+            # グリッドを描画（3×3の盤では画像をマスの大きさに合わせて拡大縮小する）
+            grid_img = assets.scaled("grid", grid_rect.size) if size == 3 and visible else None
+            if grid_img:
+                grid_img.blit(screen, grid_rect.topleft)
+            elif visible:
+                pygame.draw.rect(screen, WHITE, visible)
+                # 格子線（マスの境目の線は両隣のマスに掛かるので、見えるマスの範囲の前後の線まで描く）
+                line_width = max(1, cell_size // 20)
+                for i in range(max(1, cols.start), min(size, cols.stop + 1)):
+                    pygame.draw.line(screen, BLACK, 
+                                    (grid_rect.x + i * cell_size, grid_rect.y),
+                                    (grid_rect.x + i * cell_size, grid_rect.bottom), line_width)
+                for i in range(max(1, rows.start), min(size, rows.stop + 1)):
+                    pygame.draw.line(screen, BLACK, 
+                                    (grid_rect.x, grid_rect.y + i * cell_size),
+                                    (grid_rect.right, grid_rect.y + i * cell_size), line_width)
+            
+            # 駒を描画（画像はマスの4/5の大きさにして、端から1/10のところに置く）
+            piece_size = (cell_size * 4 // 5, cell_size * 4 // 5)
+            maru_img = assets.scaled("maru", piece_size) if size == 3 else None
+            batsu_img = assets.scaled("batsu", piece_size) if size == 3 else None
+            margin = cell_size // 10
+            stroke = max(2, cell_size // 20)
+            for row in rows:
+                for col in cols:
+                    piece = self.board.get(row, col)
+                    if not piece:
+                        continue
+                    x, y = self.cell_rect(self.board.index(row, col)).topleft
+                    if piece == PLAYER_MARU:
+                        if maru_img:
+                            maru_img.blit(screen, (x + margin, y + margin))
+                        else:
+                            pygame.draw.circle(screen, BLUE, 
+                                             (x + cell_size // 2, y + cell_size // 2),
+                                             cell_size * 2 // 5, stroke)
+                    elif piece == PLAYER_BATSU:
+                        if batsu_img:
+                            batsu_img.blit(screen, (x + margin, y + margin))
+                        else:
+                            near = cell_size * 3 // 20
+                            far = cell_size - near
+                            pygame.draw.line(screen, RED, (x + near, y + near), (x + far, y + far), stroke)
+                            pygame.draw.line(screen, RED, (x + far, y + near), (x + near, y + far), stroke)
+            
+            # 勝利ラインを描画
+            if self.winning_line and clip.colliderect(self.win_line_rect(self.winning_line)):
+                self.win_line_renderer.draw(screen, self.grid_rect.topleft, self.winning_line,
+                                            size, cell_size, self.win_line_progress())
+            
+            # 現在のプレイヤー表示
+            if self.state == GameState.PLAYING and clip.colliderect(self.status_rect):
+                if self.current_player == PLAYER_MARU:
+                    player_text = label_cache.render(large_font, "○の番です", BLUE)
+                else:
+                    player_text = label_cache.render(large_font, "×の番です", RED)
+                player_rect = player_text.get_rect(center=(layout.size[0] // 2, layout.point(400, 100)[1]))
+                screen.blit(player_text, player_rect)
+                
+                # 「CPUが考え中」などの表示
+                message = self.status_message()
+                if message:
+                    thinking_text = label_cache.render(default_font, message, RED)
+                    thinking_rect = thinking_text.get_rect(center=(layout.size[0] // 2, layout.point(400, 140)[1]))
+                    screen.blit(thinking_text, thinking_rect)
+            
+            # ゲーム終了時の表示
+            if self.state == GameState.GAME_OVER and clip.colliderect(self.status_rect):
+                if self.winner == PLAYER_MARU:
+                    result_text = label_cache.render(large_font, "○の勝ち！", BLUE)
+                elif self.winner == PLAYER_BATSU:
+                    result_text = label_cache.render(large_font, "×の勝ち！", RED)
+                else:
+                    result_text = label_cache.render(large_font, "引き分け！", BLACK)
+                result_rect = result_text.get_rect(center=(layout.size[0] // 2, layout.point(400, 100)[1]))
+                screen.blit(result_text, result_rect)
+            
+            # リスタートボタン
+            if self.state == GameState.GAME_OVER and clip.colliderect(self.restart_button_rect):
+                restart_button_img = assets.scaled("restart_button", self.restart_button_rect.size)
+                if restart_button_img:
+                    restart_button_img.blit(screen, self.restart_button_rect.topleft)
+                else:
+                    pygame.draw.rect(screen, GREEN, self.restart_button_rect, border_radius=radius)
+                    restart_text = label_cache.render(default_font, "もう一度プレイ", WHITE)
+                    restart_rect = restart_text.get_rect(center=self.restart_button_rect.center)
+                    screen.blit(restart_text, restart_rect)
+            
+            # 履歴のバー
+            if self.shows_history() and clip.colliderect(self.history_area_rect):
+                self.draw_history(screen)
+        
+        # マウスが乗っているボタンを強調
+        if self.hover_rect and self.hover_rect in self.visible_buttons() and clip.colliderect(
+                self.hover_rect.inflate(self.layout.px(8), self.layout.px(8))):
+            layout = self.layout
+            pygame.draw.rect(screen, YELLOW, self.hover_rect.inflate(layout.px(4), layout.px(4)), layout.px(3),
+                             border_radius=layout.px(12))
+
+    def draw_history(self, screen):
+        """履歴のバー（打った手の割合・つまみ・何手目か）を描画"""
+        total = self.history_length()
+        if not total:
+            return
+        layout = self.layout
+        rect = self.history_rect
+        radius = rect.height // 2
+        pygame.draw.rect(screen, GRAY, rect, border_radius=radius)
+        knob_x = rect.x + rect.width * len(self.moves) // total
+        if knob_x > rect.x:
+            pygame.draw.rect(screen, BLUE, (rect.x, rect.y, knob_x - rect.x, rect.height), border_radius=radius)
+        
+        # 1手ごとの目盛り
+        if total <= HISTORY_TICKS_MAX:
+            inset = layout.px(4)
+            for index in range(1, total):
+                x = rect.x + rect.width * index // total
+                pygame.draw.line(screen, WHITE, (x, rect.y + inset), (x, rect.bottom - inset - 1), layout.px(1))
+        
+        # つまみ
+        knob_radius = rect.height * 3 // 4
+        pygame.draw.circle(screen, WHITE, (knob_x, rect.centery), knob_radius)
+        pygame.draw.circle(screen, BLACK, (knob_x, rect.centery), knob_radius, layout.px(2))
+        
+        # 何手目か
+        count_text = label_cache.render(default_font, f"{len(self.moves)}/{total}", BLACK)
+        count_rect = count_text.get_rect(midleft=(rect.right + layout.px(20), rect.centery))
+        screen.blit(count_text, count_rect)
+
+# ネットワーク対戦の画面
+class OnlineApp(MaruBatsuApp):
+    """サーバーにつないで対戦する画面（盤面はサーバーから届いた手だけで進める）"""
+    
+    def __init__(self, client):
+        super().__init__()
+        self.recorder = None
+        self.client = client
+        self.online_player = None  # 自分の駒（対戦が始まるまで None）
+        # メッセージが届いたら、入力を待って眠っているループを起こす
+        client.notify = lambda: pygame.event.post(pygame.event.Event(NETWORK_EVENT))
+    
+    def reset_game(self, seed=None):
+        """サーバーに対戦を申し込む（先手後手はサーバーが決めるので seed は使わない）"""
+        self.cancel_cpu()
+        self.board.clear()
+        self.current_player = PLAYER_MARU
+        self.first_player = PLAYER_MARU
+        self.moves = []
+        self.undone_moves = []
+        self.winner = None
+        self.winning_line = None
+        self.online_player = None
+        self.state = GameState.PLAYING
+        size, win_length = self.board.size, self.board.win_length
+        if self.vs_cpu:
+            self.client.send(f"PLAY CPU {self.cpu_level} {size} {win_length}")
+        else:
+            self.client.send(f"PLAY HUMAN {size} {win_length}")
+    
+    def cancel_cpu(self):
+        """対戦中・相手を待っている途中なら投了する"""
+        if self.state == GameState.PLAYING:
+            self.client.send("LEAVE")
+        self.online_player = None
+        super().cancel_cpu()
+    
+    def make_move(self, row, col):
+        """自分の番ならサーバーに手を送る（盤面は MOVED が届いてから変わる）"""
+        cell = self.board.index(row, col)
+        if (self.state == GameState.PLAYING and self.current_player == self.online_player
+                and self.board.is_empty(cell)):
+            self.client.send(f"MOVE {cell}")
+    
+    def receive(self, words):
+        """サーバーからのメッセージを1つ処理する"""
+        command, args = words[0], words[1:]
+        if command == "CLOSED":
+            print("サーバーとの接続が切れました")
+            self.online_player = None
+            self.state = GameState.TITLE
+        elif command == "ERROR":
+            print(f"サーバーからのエラー: {' '.join(args)}")
+        elif self.state != GameState.PLAYING:
+            # 投了したゲームの結果など
+            return
+        elif command == "START":
+            self.online_player = PLAYER_MARU if args[1] == "O" else PLAYER_BATSU
+        elif self.online_player is None:
+            # 前のゲームのメッセージ
+            return
+        elif command == "MOVED":
+            self.current_player = PLAYER_MARU if args[0] == "O" else PLAYER_BATSU
+            MaruBatsuGame.make_move(self, *self.board.position(int(args[1])))
+            self.cpu_thinking = False
+        elif command == "END":
+            self.state = GameState.GAME_OVER
+            self.winner = {"O": PLAYER_MARU, "X": PLAYER_BATSU}.get(args[0], 0)
+            self.winning_line = tuple(int(cell) for cell in args[1:]) or None
+    
+    def can_undo(self):
+        """ネットワーク対戦では待ったできない（盤面はサーバーが決める）"""
+        return False
+    
+    def can_redo(self):
+        return False
+    
+    def status_message(self):
+        if self.state != GameState.PLAYING:
+            return None
+        if self.online_player is None:
+            return "対戦相手を待っています..."
+        if self.current_player != self.online_player:
+            return "CPUが考え中..." if self.vs_cpu else "相手の番です..."
+        return None
+    
+    def update(self):
+        """届いたメッセージを処理してから、ゲーム状態を更新"""
+        for words in self.client.poll():
+            self.receive(words)
+        super().update()
+    
+    def close(self):
+        super().close()
+        self.client.close()
+
+class ProfilerOverlay:
+    """計測結果の表を画面の左上に重ねて描く
+
+    表は不透明な箱なので、下の画面を描き直さずに上から貼るだけでよい。
+    ゲームが箱に重なる領域を描き直したときと、表を書き換えたときに貼り直す。
+    """
+    
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.font = pygame.font.SysFont("monospace", 14)
+        self.surface = None
+        self.rect = None
+        self.refreshed_at = None
+    
+    def render(self, screen, dirty):
+        """必要なら表を貼り、画面に送る領域のリストを返す"""
+        now = pygame.time.get_ticks()
+        refresh = self.refreshed_at is None or now - self.refreshed_at >= PROFILER_REFRESH
+        if refresh:
+            lines = self.profiler.report_lines()
+            labels = [self.font.render(line, True, WHITE) for line in lines]
+            line_height = self.font.get_linesize()
+            width = max(label.get_width() for label in labels) + 12
+            self.surface = pygame.Surface((width, line_height * len(labels) + 12))
+            self.surface.fill((32, 32, 32))
+            for index, label in enumerate(labels):
+                self.surface.blit(label, (6, 6 + index * line_height))
+            self.refreshed_at = now
+            old_rect = self.rect
+            self.rect = self.surface.get_rect(topleft=(0, 0))
+            if old_rect is not None and not self.rect.contains(old_rect):
+                self.rect.union_ip(old_rect)
+        elif self.rect.collidelist(dirty) < 0:
+            return dirty
+        screen.blit(self.surface, (0, 0))
+        return dirty + [self.rect]
+
+
+def wait_events(timeout):
+    """イベントが届くか timeout ミリ秒たつまで眠り、届いたイベントのリストを返す
+
+    timeout が None なら届くまで眠る。0 なら眠らずに溜まっているものだけを返す。
+    """
+    if timeout == 0:
+        return pygame.event.get()
+    event = pygame.event.wait() if timeout is None else pygame.event.wait(timeout)
+    if event.type == pygame.NOEVENT:
+        return []
+    return [event] + pygame.event.get()
+
+
+def main(argv=None):
+    """ゲームを起動（--connect HOST:PORT でネットワーク対戦）"""
+    parser = argparse.ArgumentParser(prog="maru_batsu_game", description="○×ゲーム")
+    parser.add_argument("--connect", metavar="HOST:PORT", default=None,
+                        help="ネットワーク対戦のサーバーにつなぐ")
+    parser.add_argument("--profile", metavar="SECONDS", type=float, nargs="?", const=5.0, default=None,
+                        help="フレーム時間とCPUの思考時間を測り、SECONDS 秒ごとに表を出力する")
+    parser.add_argument("--fullscreen", action="store_true", help="全画面表示で起動する（F11 で切り替え）")
+    parser.add_argument("--fixed-fps", action="store_true",
+                        help="何も動かない画面でも毎秒60回更新・描画する（既定では入力やCPUの手を待って眠る）")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="乱数の種（同じ種なら先手後手とCPUの手が同じ並びになる）")
+    args = parser.parse_args(argv)
+    
+    client = None
+    if args.connect:
+        try:
+            client = LineClient(*parse_address(args.connect, DEFAULT_PORT))
+        except (OSError, ValueError) as e:
+            parser.error(f"サーバーに接続できません: {e}")
+    
+    screen = init(args.fullscreen)
+    
+    # ゲームの初期化
+    game = OnlineApp(client) if client else MaruBatsuApp(args.seed)
+    game.resize(screen.get_size())
+    
+    # 計測（F3 で表示を切り替える。測らないときは None のままにしておく）
+    profiler = None
+    if args.profile is not None:
+        profiler = FrameProfiler(dump_interval=args.profile)
+        game.profiler = profiler
+    overlay = None
+    # F3 が押されたか（表の切り替えは、計測の区切りがずれないように次のフレームの頭で行う）
+    toggle_overlay = False
+    
+    # ゲームループ
+    clock = pygame.time.Clock()
+    running = True
+    
+    while running:
+        if toggle_overlay:
+            toggle_overlay = False
+            if overlay is None:
+                if profiler is None:
+                    profiler = FrameProfiler()
+                    game.profiler = profiler
+                overlay = ProfilerOverlay(profiler)
+            else:
+                # 表を消す（--profile で起動していなければ測るのもやめる）
+                overlay = None
+                game.invalidate()
+                if args.profile is None:
+                    profiler = None
+                    game.profiler = None
+        if profiler is not None:
+            profiler.start_frame()
+        
+        # 何も動かないときは、入力か次にCPUが打つ時刻まで眠る
+        if args.fixed_fps:
+            events = pygame.event.get()
+        else:
+            timeout = game.next_update_in()
+            if profiler is not None:
+                # 計測中は表を書き換えるために一定間隔で起きる
+                timeout = PROFILER_REFRESH if timeout is None else min(timeout, PROFILER_REFRESH)
+            events = wait_events(timeout)
+        if profiler is not None:
+            profiler.mark("idle")
+        
+        # イベント処理
+        for event in events:
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                game.invalidate()
+            elif event.type == pygame.VIDEORESIZE:
+                # ウィンドウの大きさが変わったら配置を計算し直す
+                screen = pygame.display.get_surface()
+                game.resize(screen.get_size())
+            elif event.type == pygame.KEYDOWN and event.key == FULLSCREEN_KEY:
+                screen = toggle_fullscreen()
+                game.resize(screen.get_size())
+                continue
+            elif event.type == pygame.KEYDOWN and event.key == PROFILER_KEY:
+                toggle_overlay = not toggle_overlay
+                continue
+            
+            game.handle_event(event)
+        if profiler is not None:
+            profiler.mark("events")
+        
+        # ゲーム状態の更新
+        game.update()
+        if profiler is not None:
+            profiler.mark("update")
+        
+        # 変化した部分だけを描画して画面に送る（変化がなければ何もしない）
+        dirty = game.render(screen)
+        if overlay is not None:
+            dirty = overlay.render(screen, dirty)
+        if profiler is not None:
+            profiler.mark("draw")
+        if dirty:
+            pygame.display.update(dirty)
+        if profiler is not None:
+            profiler.mark("flip")
+            profiler.maybe_dump()
+        if toggle_overlay:
+            # 眠らずに次のフレームで表を切り替える
+            pygame.event.post(pygame.event.Event(pygame.VIDEOEXPOSE))
+        clock.tick(60)
+    
+    # 探索中のスレッドを止め、記録を書き出してからPygameを終了
+    game.close()
+    pygame.quit()
+    sys.exit()
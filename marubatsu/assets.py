@@ -0,0 +1,203 @@
+"""画像の管理（テクスチャアトラスと表示形式への変換）
+
+スプライトは1枚のアトラス画像 ``atlas.png`` にまとめ、各スプライトの
+位置は ``atlas.json`` に書いておく。透明な余白は詰めて、元の画像内での
+位置（offset）を記録する。アトラスは最初に使われたときに読み込み、
+画面の形式に convert_alpha() してから切り出す（切り出しはコピーしない）。
+画面の大きさに合わせて拡大縮小したものは、大きさごとに一度だけ smoothscale で作って覚えておく。
+
+    python -m maru_batsu_game pack-assets   # アトラスを作り直す
+"""
+
+import argparse
+import json
+import os
+
+import pygame
+
+ASSET_DIR = os.path.join("assets", "images")
+ATLAS_IMAGE = "atlas.png"
+ATLAS_MANIFEST = "atlas.json"
+
+# アトラスにまとめるスプライト（背景は不透明な全画面画像なので別に持つ）
+SPRITES = ("grid", "maru", "batsu", "title", "restart_button")
+
+# スプライト間の隙間（拡大縮小時のにじみ防止）
+PADDING = 1
+
+
+class Sprite:
+    """アトラスから切り出した画像と、元の画像内での位置"""
+
+    __slots__ = ("surface", "offset", "size")
+
+    def __init__(self, surface, offset=(0, 0), size=None):
+        self.surface = surface
+        self.offset = offset
+        self.size = size or surface.get_size()
+
+    def get_rect(self, **kwargs):
+        """元の画像の大きさの Rect（pygame.Surface.get_rect と同じ使い方）"""
+        rect = pygame.Rect((0, 0), self.size)
+        for name, value in kwargs.items():
+            setattr(rect, name, value)
+        return rect
+
+    def blit(self, screen, pos):
+        """元の画像の左上が pos になるように描画"""
+        screen.blit(self.surface, (pos[0] + self.offset[0], pos[1] + self.offset[1]))
+
+
+def _load(path):
+    try:
+        return pygame.image.load(path)
+    except (pygame.error, FileNotFoundError) as e:
+        print(f"画像の読み込みに失敗しました: {path}")
+        print(e)
+        return None
+
+
+class AssetManager:
+    """画像を最初に使うときに読み込んで保持する"""
+
+    def __init__(self, directory=ASSET_DIR):
+        self.directory = directory
+        self._sprites = None
+        self._background = None
+        self._background_loaded = False
+        self._scaled = {}  # (名前, 大きさ) -> 拡大縮小したもの
+
+    def _load_sprites(self):
+        sprites = {}
+        manifest_path = os.path.join(self.directory, ATLAS_MANIFEST)
+        atlas = None
+        if os.path.exists(manifest_path):
+            atlas = _load(os.path.join(self.directory, ATLAS_IMAGE))
+        if atlas is not None:
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            atlas = atlas.convert_alpha()
+            for name, entry in manifest["sprites"].items():
+                surface = atlas.subsurface(pygame.Rect(entry["rect"]))
+                sprites[name] = Sprite(surface, tuple(entry["offset"]), tuple(entry["size"]))
+            return sprites
+
+        # アトラスがなければ個別の画像を読み込む
+        for name in SPRITES:
+            image = _load(os.path.join(self.directory, f"{name}.png"))
+            if image is not None:
+                sprites[name] = Sprite(image.convert_alpha())
+        return sprites
+
+    def get(self, name):
+        """スプライトを返す（なければ None）"""
+        if self._sprites is None:
+            self._sprites = self._load_sprites()
+        return self._sprites.get(name)
+
+    def scaled(self, name, size):
+        """元の画像が size の大きさになるように拡大縮小したスプライト（なければ None）"""
+        sprite = self.get(name)
+        size = tuple(size)
+        if sprite is None or size == sprite.size:
+            return sprite
+        key = (name, size)
+        scaled = self._scaled.get(key)
+        if scaled is None:
+            scale_x = size[0] / sprite.size[0]
+            scale_y = size[1] / sprite.size[1]
+            width, height = sprite.surface.get_size()
+            surface = pygame.transform.smoothscale(
+                sprite.surface, (max(1, round(width * scale_x)), max(1, round(height * scale_y))))
+            offset = (round(sprite.offset[0] * scale_x), round(sprite.offset[1] * scale_y))
+            scaled = self._scaled[key] = Sprite(surface, offset, size)
+        return scaled
+
+    def background(self, size=None):
+        """背景画像（size を渡すとその大きさに拡大縮小したもの。なければ None）"""
+        if not self._background_loaded:
+            image = _load(os.path.join(self.directory, "background.png"))
+            self._background = image.convert() if image is not None else None
+            self._background_loaded = True
+        if self._background is None or size is None or tuple(size) == self._background.get_size():
+            return self._background
+        key = ("background", tuple(size))
+        scaled = self._scaled.get(key)
+        if scaled is None:
+            scaled = self._scaled[key] = pygame.transform.smoothscale(self._background, size)
+        return scaled
+
+    def clear_scaled(self):
+        """拡大縮小したものを捨てる（画面の大きさが変わったとき）"""
+        self._scaled.clear()
+
+
+def _shelf_pack(sizes, width):
+    """棚詰め: 高い順に左から並べ、入らなくなったら次の段へ
+
+    (幅, 高さ, {名前: (x, y)}) を返す。
+    """
+    placements = {}
+    x = y = shelf_height = 0
+    for name in sorted(sizes, key=lambda name: sizes[name][1], reverse=True):
+        w, h = sizes[name]
+        if x and x + w > width:
+            x = 0
+            y += shelf_height + PADDING
+            shelf_height = 0
+        placements[name] = (x, y)
+        x += w + PADDING
+        shelf_height = max(shelf_height, h)
+    return width, y + shelf_height, placements
+
+
+def pack_atlas(directory=ASSET_DIR, names=SPRITES):
+    """個別の画像を1枚のアトラスにまとめ、画像とマニフェストを保存する
+
+    透明な余白を詰めたうえで、高さの順に棚詰めする。
+    """
+    images = {}
+    for name in names:
+        image = pygame.image.load(os.path.join(directory, f"{name}.png"))
+        bounds = image.get_bounding_rect()
+        if bounds.width == 0 or bounds.height == 0:
+            bounds = pygame.Rect(0, 0, 1, 1)
+        images[name] = (image, bounds)
+
+    # 幅をいくつか試して、面積が最小になるものを使う
+    sizes = {name: bounds.size for name, (_, bounds) in images.items()}
+    min_width = max(w for w, _ in sizes.values())
+    width, height, placements = min(
+        (_shelf_pack(sizes, width) for width in range(min_width, 2 * min_width + 1, 8)),
+        key=lambda packed: packed[0] * packed[1],
+    )
+
+    atlas = pygame.Surface((width, height), pygame.SRCALPHA)
+    atlas.fill((0, 0, 0, 0))
+    manifest = {"image": ATLAS_IMAGE, "sprites": {}}
+    for name in names:
+        image, bounds = images[name]
+        x, y = placements[name]
+        atlas.blit(image, (x, y), bounds)
+        manifest["sprites"][name] = {
+            "rect": [x, y, bounds.width, bounds.height],
+            "offset": [bounds.x, bounds.y],
+            "size": list(image.get_size()),
+        }
+
+    pygame.image.save(atlas, os.path.join(directory, ATLAS_IMAGE))
+    with open(os.path.join(directory, ATLAS_MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    return atlas.get_size()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="maru_batsu_game pack-assets",
+                                     description="スプライトをテクスチャアトラスにまとめる")
+    parser.add_argument("--dir", default=ASSET_DIR, help="画像のディレクトリ")
+    args = parser.parse_args(argv)
+
+    width, height = pack_atlas(args.dir)
+    print(f"Generated {ATLAS_IMAGE} ({width}x{height}) and {ATLAS_MANIFEST}")
+    return 0
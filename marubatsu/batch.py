@@ -0,0 +1,156 @@
+"""NumPyで多数の盤面を同時に進めるバッチエンジン
+
+N 個の盤面を (N, 9) の int8 配列で持ち、全ての盤面に一度に手を打つ。
+勝利ラインの判定は (N, 9) x (9, 8) の行列積1回で行う。
+Python のループは手数（最大9回）ぶんだけで、盤面ごとには回さない。
+"""
+
+import numpy as np
+
+from marubatsu.board import PLAYER_MARU, PLAYER_BATSU, WIN_MASKS
+from marubatsu.learned import get_model
+
+# LINE_MATRIX[cell, line] -> マスが勝利ラインに含まれるなら 1
+LINE_MATRIX = np.array(
+    [[mask >> cell & 1 for mask in WIN_MASKS] for cell in range(9)], dtype=np.int8
+)
+
+CENTER = 4
+CORNERS = np.array([0, 2, 6, 8])
+
+
+class BatchGames:
+    """N 個のゲームを同時に進める"""
+
+    def __init__(self, size, first_player=PLAYER_MARU):
+        self.boards = np.zeros((size, 9), dtype=np.int8)
+        self.current = np.full(size, first_player, dtype=np.int8)
+        self.winners = np.zeros(size, dtype=np.int8)  # 0: 勝者なし
+        self.done = np.zeros(size, dtype=bool)
+
+    def __len__(self):
+        return len(self.boards)
+
+    def reset(self, first_player=PLAYER_MARU):
+        """全ゲームを初期状態に戻す"""
+        self.boards[:] = 0
+        self.current[:] = first_player
+        self.winners[:] = 0
+        self.done[:] = False
+
+    def legal_mask(self):
+        """(N, 9) の打てるマス（終わったゲームは全て False）"""
+        return (self.boards == 0) & ~self.done[:, None]
+
+    def line_counts(self, player):
+        """(N, 8) の各勝利ラインにある player の駒の数（player はスカラーか (N,) 配列）"""
+        own = self.boards == np.asarray(player, dtype=np.int8).reshape(-1, 1)
+        return own.astype(np.int8) @ LINE_MATRIX
+
+    def apply(self, moves):
+        """各ゲームの手番のプレイヤーとして moves のマスに打つ
+
+        終わっているゲームの手は無視する。空いていないマスを指定してはいけない。
+        """
+        active = np.flatnonzero(~self.done)
+        if len(active) == 0:
+            return
+        self.boards[active, moves[active]] = self.current[active]
+
+        won = (self.line_counts(self.current) == 3).any(axis=1) & ~self.done
+        full = (self.boards != 0).all(axis=1)
+        self.winners[won] = self.current[won]
+        self.done |= won | full
+
+        # まだ続くゲームだけ手番を交代
+        playing = ~self.done
+        self.current[playing] = PLAYER_MARU + PLAYER_BATSU - self.current[playing]
+
+    def play(self, policy_maru, policy_batsu, rng):
+        """全ゲームを最後まで打つ（policy は ``policy(games, rng) -> (N,) のマス``）"""
+        while not self.done.all():
+            maru_to_move = self.current == PLAYER_MARU
+            if maru_to_move.all():
+                moves = policy_maru(self, rng)
+            elif not maru_to_move.any():
+                moves = policy_batsu(self, rng)
+            else:
+                moves = np.where(maru_to_move, policy_maru(self, rng), policy_batsu(self, rng))
+            self.apply(moves)
+        return self.winners
+
+
+def _pick(scores):
+    """(N, 9) のスコアが最大のマスを選ぶ"""
+    return scores.argmax(axis=1)
+
+
+def random_moves(games, rng):
+    """打てるマスから一様に1つ選ぶ"""
+    scores = rng.random(games.boards.shape)
+    scores[~games.legal_mask()] = -1.0
+    return _pick(scores)
+
+
+def _completing_cells(games, player, empty):
+    """player が置けば勝利ラインが揃う (N, 9) のマス"""
+    counts = games.line_counts(player)
+    empty_counts = empty.astype(np.int8) @ LINE_MATRIX
+    open_lines = (counts == 2) & (empty_counts == 1)
+    return (open_lines.astype(np.int8) @ LINE_MATRIX.T > 0) & empty
+
+
+def heuristic_moves(games, rng):
+    """cpu_level 2 の「少し賢い戦略」のバッチ版
+
+    勝てる手、相手の勝ち手のブロック、中央、角、それ以外の順に優先する。
+    勝ち手とブロックは番号の小さいマスを選び、角とそれ以外はランダムに選ぶ。
+    """
+    empty = games.legal_mask()
+    opponent = PLAYER_MARU + PLAYER_BATSU - games.current
+
+    # 優先度 * 10 + 同じ優先度の中での順位（0〜1）
+    scores = rng.random(games.boards.shape)
+    scores[:, CORNERS] += 10.0
+    scores[:, CENTER] = 20.0
+    first_cell = np.linspace(0.9, 0.0, 9)
+    scores = np.where(_completing_cells(games, opponent, empty), 30.0 + first_cell, scores)
+    scores = np.where(_completing_cells(games, games.current, empty), 40.0 + first_cell, scores)
+    scores[~empty] = -1.0
+    return _pick(scores)
+
+
+def learned_moves(games, rng):
+    """cpu_level 6 の「学習した戦略」のバッチ版
+
+    手番側から見た局面の番号を内積1回で求め、学習した表を1回引く。
+    同じ価値のマスはランダムに選ぶ。表がなければ heuristic_moves で打つ。
+    """
+    model = get_model()
+    if model is None:
+        return heuristic_moves(games, rng)
+    digits = np.where(games.boards == games.current[:, None], 1, np.where(games.boards == 0, 0, 2))
+    scores = model.batch_scores(digits) + rng.random(games.boards.shape) * 1e-6
+    scores[~games.legal_mask()] = -np.inf
+    return _pick(scores)
+
+
+# 戦略名 -> バッチ版の戦略
+BATCH_POLICIES = {
+    "random": random_moves,
+    "heuristic": heuristic_moves,
+    "learned": learned_moves,
+}
+
+
+def play_batch(size, name1, name2, seed=None):
+    """name1（○・先手）と name2（×）を size ゲーム同時に対戦させる
+
+    name1 から見た (勝ち, 引き分け, 負け) を返す。
+    """
+    rng = np.random.default_rng(seed)
+    games = BatchGames(size)
+    winners = games.play(BATCH_POLICIES[name1], BATCH_POLICIES[name2], rng)
+    wins = int(np.count_nonzero(winners == PLAYER_MARU))
+    losses = int(np.count_nonzero(winners == PLAYER_BATSU))
+    return wins, size - wins - losses, losses
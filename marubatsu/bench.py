@@ -0,0 +1,284 @@
+"""ルール・CPU・描画のベンチマーク
+
+各項目は「n 回の操作を行う関数」で、0.2 秒以上かかる回数を自動で決めてから
+5 回測り、最も速かった回の1操作あたりの時間を結果にする。
+結果は JSON で出力し、保存しておいた基準（baseline）と比べて
+しきい値より遅くなった項目を回帰として報告する。
+
+    python -m maru_batsu_game bench --output baseline.json
+    python -m maru_batsu_game bench --compare baseline.json --threshold 0.1
+
+描画は SDL のダミーのビデオドライバで、画面外の Surface に描いて測る。
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+from marubatsu.board import PLAYER_MARU, Board, opponent
+from marubatsu.game import GameState, MaruBatsuGame
+from marubatsu.policies import CPU_LEVELS
+
+# 1回の計測の最短時間（秒）と、計測の回数
+MIN_TIME = 0.2
+REPEAT = 5
+
+# 回帰とみなす遅くなり方の既定値（0.1 なら 10% 遅くなったら回帰）
+DEFAULT_THRESHOLD = 0.1
+
+# 測る局面（○が中央、×が角に打った後の○の番）
+OPENING = (4, 0)
+
+# 勝者の決まらない手順（make_move の計測用）
+QUIET_MOVES = (4, 0, 2, 6, 3)
+
+# 全ての項目: 名前 -> n 回の操作を行う関数を作る関数
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """ベンチマークを登録するデコレータ"""
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return decorator
+
+
+def _playing_game(moves=OPENING):
+    game = MaruBatsuGame()
+    game.vs_cpu = False
+    game.reset_game()
+    for cell in moves:
+        game.make_move(*game.board.position(cell))
+    return game
+
+
+@benchmark("check_winner")
+def _check_winner():
+    game = _playing_game()
+
+    def run(n):
+        for _ in range(n):
+            game.check_winner(set_winning_line=False)
+    return run
+
+
+@benchmark("is_board_full")
+def _is_board_full():
+    game = _playing_game()
+
+    def run(n):
+        for _ in range(n):
+            game.is_board_full()
+    return run
+
+
+@benchmark("make_move")
+def _make_move():
+    game = _playing_game(())
+    positions = [game.board.position(cell) for cell in QUIET_MOVES]
+    per_game = len(positions)
+
+    def run(n):
+        board = game.board
+        for _ in range(n):
+            board.clear()
+            game.moves.clear()
+            game.current_player = PLAYER_MARU
+            for row, col in positions:
+                game.make_move(row, col)
+    run.ops_per_call = per_game
+    return run
+
+
+def _cpu_move(level):
+    def setup():
+        game = _playing_game()
+        base = game.board.copy()
+        moves = tuple(game.moves)
+        game.cpu_level = level
+
+        def run(n):
+            for _ in range(n):
+                game.board = base.copy()
+                game.moves = list(moves)
+                game.state = GameState.PLAYING
+                game.current_player = PLAYER_MARU
+                game.winner = None
+                game.cpu_move()
+        return run
+    return setup
+
+
+for _level, _name in CPU_LEVELS.items():
+    benchmark(f"cpu_move[{_level}:{_name}]")(_cpu_move(_level))
+del _level, _name
+
+
+@benchmark("random_playout")
+def _random_playout():
+    board = Board()
+    rng = random.Random(0)
+
+    def run(n):
+        for _ in range(n):
+            board.clear()
+            player = PLAYER_MARU
+            while not board.winner() and not board.is_full():
+                board.place(rng.choice(board.empty_cells()), player)
+                player = opponent(player)
+    return run
+
+
+@contextlib.contextmanager
+def _dummy_sdl():
+    """SDL のビデオ・オーディオのドライバをダミーにし、終わったら元の環境変数に戻す
+
+    環境で別のドライバ（x11 など）が指定されていても、描画は常に同じ条件で測る。
+    ドライバは pygame の初期化のときに決まるので、初期化をこの中で行えばよい。
+    """
+    names = ("SDL_VIDEODRIVER", "SDL_AUDIODRIVER")
+    saved = {name: os.environ.get(name) for name in names}
+    for name in names:
+        os.environ[name] = "dummy"
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def _draw(state):
+    def setup():
+        with _dummy_sdl():
+            import pygame
+            from marubatsu import app
+
+            if app.screen is None:
+                app.init()
+            game = app.MaruBatsuApp()
+            game.recorder = None
+            if state == GameState.PLAYING:
+                game.vs_cpu = False
+                game.reset_game()
+                for cell in OPENING:
+                    game.make_move(*game.board.position(cell))
+            surface = pygame.Surface((app.WIDTH, app.HEIGHT))
+            game.draw(surface)
+
+        def run(n):
+            for _ in range(n):
+                game.draw(surface)
+        return run
+    return setup
+
+
+benchmark("draw[title]")(_draw(GameState.TITLE))
+benchmark("draw[playing]")(_draw(GameState.PLAYING))
+
+
+def measure(setup):
+    """1操作あたりの時間（秒）"""
+    run = setup()
+    ops_per_call = getattr(run, "ops_per_call", 1)
+    n = 1
+    while True:
+        start = time.perf_counter()
+        run(n)
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_TIME:
+            break
+        n = n * 10 if elapsed < MIN_TIME / 10 else int(n * MIN_TIME / elapsed) + 1
+    best = elapsed
+    for _ in range(REPEAT - 1):
+        start = time.perf_counter()
+        run(n)
+        best = min(best, time.perf_counter() - start)
+    return best / (n * ops_per_call)
+
+
+def run_benchmarks(names):
+    """{名前: {"seconds_per_op": 秒, "ops_per_sec": 回}} を返す"""
+    results = {}
+    for name in names:
+        seconds = measure(BENCHMARKS[name])
+        results[name] = {"seconds_per_op": seconds, "ops_per_sec": 1 / seconds if seconds else 0.0}
+    return results
+
+
+def compare(baseline, results, threshold=DEFAULT_THRESHOLD):
+    """基準と比べた [(名前, 基準の秒, 今回の秒, 変化率, 回帰か)] を返す"""
+    rows = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]["seconds_per_op"]
+        new = result["seconds_per_op"]
+        change = new / old - 1 if old else 0.0
+        rows.append((name, old, new, change, change > threshold))
+    return rows
+
+
+def _format_time(seconds):
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f}ms"
+    if seconds >= 1e-6:
+        return f"{seconds * 1e6:.2f}us"
+    return f"{seconds * 1e9:.0f}ns"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="maru_batsu_game bench",
+                                     description="ルール・CPU・描画の速さを測る")
+    parser.add_argument("names", nargs="*", help=f"測る項目（既定: 全て。{', '.join(BENCHMARKS)}）")
+    parser.add_argument("--output", default=None, help="結果の JSON を書くファイル（既定: 標準出力）")
+    parser.add_argument("--compare", metavar="BASELINE", default=None, help="比べる基準の JSON")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="回帰とみなす遅くなり方（0.1 なら 10%%）")
+    args = parser.parse_args(argv)
+
+    names = args.names or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            parser.error(f"未登録の項目です: {name!r}")
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["benchmarks"]
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": int(time.time()),
+        "benchmarks": run_benchmarks(names),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    elif baseline is None:
+        print(text)
+
+    if baseline is None:
+        if args.output:
+            for name, result in report["benchmarks"].items():
+                print(f"{name:28s}{_format_time(result['seconds_per_op']):>12s}")
+        return 0
+
+    regressions = 0
+    for name, old, new, change, regressed in compare(baseline, report["benchmarks"], args.threshold):
+        mark = "  REGRESSION" if regressed else ""
+        print(f"{name:28s}{_format_time(old):>12s} -> {_format_time(new):>10s} {change:+7.1%}{mark}")
+        regressions += regressed
+    if regressions:
+        print(f"{regressions} regression(s) beyond {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
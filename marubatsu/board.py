@@ -0,0 +1,408 @@
+"""ビットボードによる○×ゲームの盤面
+
+マスは 0〜8 の番号で表し、``row * 3 + col`` に対応する。
+各プレイヤーの駒は 9 ビットの整数で持つ。
+
+3×3 以外の盤（N×N で K 個並べたら勝ち）は GridBoard を使う。
+どちらも同じメソッドを持つので、make_board() で作れば区別せずに扱える。
+"""
+
+# プレイヤー
+PLAYER_MARU = 1
+PLAYER_BATSU = 2
+
+# 全マスのビットマスク
+FULL_MASK = 0b111111111
+
+
+def opponent(player):
+    """相手のプレイヤー"""
+    return PLAYER_BATSU if player == PLAYER_MARU else PLAYER_MARU
+
+
+def _mask(*cells):
+    bits = 0
+    for cell in cells:
+        bits |= 1 << cell
+    return bits
+
+
+# 勝利ラインの名前とマスク（同じ順番で並べる）
+LINE_NAMES = ("h1", "h2", "h3", "v1", "v2", "v3", "d1", "d2")
+WIN_MASKS = (
+    _mask(0, 1, 2),  # 横1段目
+    _mask(3, 4, 5),  # 横2段目
+    _mask(6, 7, 8),  # 横3段目
+    _mask(0, 3, 6),  # 縦1列目
+    _mask(1, 4, 7),  # 縦2列目
+    _mask(2, 5, 8),  # 縦3列目
+    _mask(0, 4, 8),  # 斜め（左上から右下）
+    _mask(2, 4, 6),  # 斜め（右上から左下）
+)
+
+
+# 勝利ラインごとのマス番号（WIN_MASKS と同じ順番）
+LINE_CELLS = tuple(
+    tuple(cell for cell in range(9) if mask >> cell & 1) for mask in WIN_MASKS
+)
+
+
+def _first_line(bits):
+    for index, mask in enumerate(WIN_MASKS):
+        if bits & mask == mask:
+            return index
+    return -1
+
+
+# 9ビットの駒配置 -> 揃っている最初の勝利ラインの番号（なければ -1）
+LINE_TABLE = tuple(_first_line(bits) for bits in range(FULL_MASK + 1))
+
+# 埋まっているマスのビット -> 空きマス番号のタプル
+EMPTY_TABLE = tuple(
+    tuple(cell for cell in range(9) if not occupied >> cell & 1)
+    for occupied in range(FULL_MASK + 1)
+)
+
+
+class Board:
+    """2つの9ビット整数で表した盤面"""
+
+    __slots__ = ("maru", "batsu")
+
+    size = 3
+    win_length = 3
+
+    def __init__(self, maru=0, batsu=0):
+        self.maru = maru
+        self.batsu = batsu
+
+    def __eq__(self, other):
+        if not isinstance(other, Board):
+            return NotImplemented
+        return self.maru == other.maru and self.batsu == other.batsu
+
+    def __hash__(self):
+        return self.maru << 9 | self.batsu
+
+    def __repr__(self):
+        return f"Board(maru={self.maru:#05x}, batsu={self.batsu:#05x})"
+
+    def copy(self):
+        """盤面を複製"""
+        return Board(self.maru, self.batsu)
+
+    def clear(self):
+        """盤面を空にする"""
+        self.maru = 0
+        self.batsu = 0
+
+    def state(self):
+        """盤面を表す変更できない値（restore() で戻せる）"""
+        return (self.maru, self.batsu)
+
+    def restore(self, state):
+        """state() で取り出した盤面に戻す"""
+        self.maru, self.batsu = state
+
+    @property
+    def occupied(self):
+        """駒が置かれているマスのビット"""
+        return self.maru | self.batsu
+
+    def index(self, row, col):
+        """行と列からマス番号を求める"""
+        return row * 3 + col
+
+    def position(self, cell):
+        """マス番号から行と列を求める"""
+        return divmod(cell, 3)
+
+    def get(self, row, col):
+        """指定した位置の駒（0: 空き）"""
+        bit = 1 << (row * 3 + col)
+        if self.maru & bit:
+            return PLAYER_MARU
+        if self.batsu & bit:
+            return PLAYER_BATSU
+        return 0
+
+    def is_empty(self, cell):
+        """マスが空いているか"""
+        return not (self.maru | self.batsu) >> cell & 1
+
+    def place(self, cell, player):
+        """マスに駒を置く（空きマスであることは呼び出し側で確認する）"""
+        if player == PLAYER_MARU:
+            self.maru |= 1 << cell
+        else:
+            self.batsu |= 1 << cell
+
+    def remove(self, cell):
+        """マスの駒を取り除く"""
+        bit = ~(1 << cell)
+        self.maru &= bit
+        self.batsu &= bit
+
+    def bits(self, player):
+        """プレイヤーの駒のビット"""
+        return self.maru if player == PLAYER_MARU else self.batsu
+
+    def empty_cells(self):
+        """空きマス番号のタプル"""
+        return EMPTY_TABLE[self.maru | self.batsu]
+
+    def ordered_empty_cells(self):
+        """空きマス番号のタプル（小さい順。empty_cells() と同じもの）"""
+        return EMPTY_TABLE[self.maru | self.batsu]
+
+    def winning_line(self):
+        """揃っている勝利ラインの番号（なければ -1）"""
+        line = LINE_TABLE[self.maru]
+        if line < 0:
+            line = LINE_TABLE[self.batsu]
+        return line
+
+    def winning_cells(self):
+        """揃っている勝利ラインのマスのタプル（なければ None）"""
+        line = self.winning_line()
+        return LINE_CELLS[line] if line >= 0 else None
+
+    def winner(self):
+        """勝者（いなければ 0）"""
+        if LINE_TABLE[self.maru] >= 0:
+            return PLAYER_MARU
+        if LINE_TABLE[self.batsu] >= 0:
+            return PLAYER_BATSU
+        return 0
+
+    def is_full(self):
+        """全マスが埋まっているか"""
+        return self.maru | self.batsu == FULL_MASK
+
+    def wins_with(self, cell, player):
+        """そのマスに置けば勝てるか"""
+        return LINE_TABLE[self.bits(player) | 1 << cell] >= 0
+
+
+# 差分判定で調べる4方向（横・縦・右下がり・左下がり）
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+class GridBoard:
+    """N×N の盤で K 個並べたら勝ち
+
+    着手のたびに置いたマスを通る4方向だけを O(K) で調べて勝敗を覚えておくので、
+    winner() と is_full() は盤の大きさによらず O(1)。空きマスは
+    入れ替え削除できるリストで持つ（並びは打った順と戻した順で変わるので、
+    乱数で選ぶときは駒の配置だけで決まる ordered_empty_cells() を使う）。
+    """
+
+    __slots__ = ("size", "win_length", "maru", "batsu",
+                 "_empty", "_slot", "_winner", "_winning_cells")
+
+    def __init__(self, size, win_length):
+        if not 1 <= win_length <= size:
+            raise ValueError(f"並べる数は1〜{size}にしてください: {win_length}")
+        self.size = size
+        self.win_length = win_length
+        self.clear()
+
+    def __repr__(self):
+        return f"GridBoard(size={self.size}, win_length={self.win_length}, stones={self.size ** 2 - len(self._empty)})"
+
+    def copy(self):
+        """盤面を複製"""
+        board = GridBoard.__new__(GridBoard)
+        board.size = self.size
+        board.win_length = self.win_length
+        board.maru = self.maru
+        board.batsu = self.batsu
+        board._empty = self._empty[:]
+        board._slot = self._slot[:]
+        board._winner = self._winner
+        board._winning_cells = self._winning_cells
+        return board
+
+    def clear(self):
+        """盤面を空にする"""
+        cells = self.size * self.size
+        self.maru = 0
+        self.batsu = 0
+        self._empty = list(range(cells))  # 空きマス（順不同）
+        self._slot = list(range(cells))  # マス -> _empty 内の位置
+        self._winner = 0
+        self._winning_cells = None
+
+    def state(self):
+        """盤面を表す変更できない値（restore() で戻せる。取り出すのは O(1)）
+
+        空きマスのリストは駒のビットから作り直せるので含めない。
+        """
+        return (self.maru, self.batsu, self._winner, self._winning_cells)
+
+    def restore(self, state):
+        """state() で取り出した盤面に戻す（空きマスのリストを小さい順に作り直す）"""
+        self.maru, self.batsu, self._winner, self._winning_cells = state
+        self._empty = self.ordered_empty_cells()
+        for slot, cell in enumerate(self._empty):
+            self._slot[cell] = slot
+
+    @property
+    def occupied(self):
+        """駒が置かれているマスのビット"""
+        return self.maru | self.batsu
+
+    def index(self, row, col):
+        """行と列からマス番号を求める"""
+        return row * self.size + col
+
+    def position(self, cell):
+        """マス番号から行と列を求める"""
+        return divmod(cell, self.size)
+
+    def get(self, row, col):
+        """指定した位置の駒（0: 空き）"""
+        bit = 1 << (row * self.size + col)
+        if self.maru & bit:
+            return PLAYER_MARU
+        if self.batsu & bit:
+            return PLAYER_BATSU
+        return 0
+
+    def is_empty(self, cell):
+        """マスが空いているか"""
+        return not (self.maru | self.batsu) >> cell & 1
+
+    def bits(self, player):
+        """プレイヤーの駒のビット"""
+        return self.maru if player == PLAYER_MARU else self.batsu
+
+    def place(self, cell, player):
+        """マスに駒を置き、そのマスを通るラインだけで勝敗を判定する"""
+        if player == PLAYER_MARU:
+            self.maru |= 1 << cell
+        else:
+            self.batsu |= 1 << cell
+
+        # 空きマスのリストから入れ替え削除
+        slot = self._slot[cell]
+        last = self._empty.pop()
+        if last != cell:
+            self._empty[slot] = last
+            self._slot[last] = slot
+
+        if not self._winner:
+            run = self._run_through(cell, self.bits(player))
+            if run:
+                self._winner = player
+                self._winning_cells = run
+
+    def remove(self, cell):
+        """マスの駒を取り除く"""
+        bit = ~(1 << cell)
+        self.maru &= bit
+        self.batsu &= bit
+        self._slot[cell] = len(self._empty)
+        self._empty.append(cell)
+        if self._winning_cells and cell in self._winning_cells:
+            self._rescan()
+
+    def _rescan(self):
+        # 勝利ラインの駒が取り除かれたときだけ盤全体を調べ直す
+        self._winner = 0
+        self._winning_cells = None
+        for player in (PLAYER_MARU, PLAYER_BATSU):
+            bits = self.bits(player)
+            for cell in range(self.size * self.size):
+                if bits >> cell & 1:
+                    run = self._run_through(cell, bits)
+                    if run:
+                        self._winner = player
+                        self._winning_cells = run
+                        return
+
+    def _run_through(self, cell, bits):
+        """cell を通って K 個以上並んでいれば、その並びのマスのタプルを返す"""
+        size = self.size
+        need = self.win_length
+        row, col = divmod(cell, size)
+        for dr, dc in DIRECTIONS:
+            run = [cell]
+            for sign in (-1, 1):
+                r, c = row + sign * dr, col + sign * dc
+                while (len(run) < 2 * need - 1 and 0 <= r < size and 0 <= c < size
+                       and bits >> (r * size + c) & 1):
+                    if sign < 0:
+                        run.insert(0, r * size + c)
+                    else:
+                        run.append(r * size + c)
+                    r += sign * dr
+                    c += sign * dc
+            if len(run) >= need:
+                return tuple(run)
+        return None
+
+    def empty_cells(self):
+        """空きマスのリスト（順不同。次の着手で変わるので書き換えないこと）"""
+        return self._empty
+
+    def ordered_empty_cells(self):
+        """空きマスのリスト（小さい順。駒のビットを下から数えて毎回作る）"""
+        free = ~(self.maru | self.batsu) & ((1 << self.size * self.size) - 1)
+        cells = []
+        while free:
+            low = free & -free
+            cells.append(low.bit_length() - 1)
+            free ^= low
+        return cells
+
+    def winning_cells(self):
+        """揃っている勝利ラインのマスのタプル（なければ None）"""
+        return self._winning_cells
+
+    def winner(self):
+        """勝者（いなければ 0）"""
+        return self._winner
+
+    def is_full(self):
+        """全マスが埋まっているか"""
+        return not self._empty
+
+    def wins_with(self, cell, player):
+        """そのマスに置けば勝てるか"""
+        return self._run_through(cell, self.bits(player) | 1 << cell) is not None
+
+
+# この大きさより大きな盤では、既に置かれた駒の近くだけを候補手にする
+NEAR_ONLY_SIZE = 5
+
+# 「近く」とみなす距離（縦横斜めのマス数）
+NEAR_DISTANCE = 2
+
+
+def candidate_moves(board):
+    """探索で調べる候補手のリスト（小さな盤では全ての空きマス）"""
+    if board.size <= NEAR_ONLY_SIZE:
+        return list(board.empty_cells())
+    occupied = board.occupied
+    if not occupied:
+        center = board.size // 2
+        return [board.index(center, center)]
+    size = board.size
+    near = set()
+    bits = occupied
+    while bits:
+        cell = (bits & -bits).bit_length() - 1
+        bits &= bits - 1
+        row, col = divmod(cell, size)
+        for r in range(max(0, row - NEAR_DISTANCE), min(size, row + NEAR_DISTANCE + 1)):
+            for c in range(max(0, col - NEAR_DISTANCE), min(size, col + NEAR_DISTANCE + 1)):
+                near.add(r * size + c)
+    return [cell for cell in near if not occupied >> cell & 1]
+
+
+def make_board(size=3, win_length=3):
+    """盤を作る（3×3 で3個並べならビットボード表を使う Board）"""
+    if size == 3 and win_length == 3:
+        return Board()
+    return GridBoard(size, win_length)
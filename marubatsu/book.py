@@ -0,0 +1,159 @@
+"""3×3の全局面を解いた表（バイナリファイル）
+
+到達可能な全局面の評価値と最善手を前もって求め、ファイルに書いておく。
+実行時はファイルをメモリマップするだけなので、探索も表の作成もいらない。
+
+    python -m maru_batsu_game build-book   # 表を作り直す
+
+局面は「手番側の駒を 1、相手の駒を 2」とした3進数（マス i の桁が 3**i）で
+番号を付け、その番号の位置に1局面 2 バイトの値を並べる（3**9 局面）。
+値は下位 9 ビットが最善手のマス、その上の 5 ビットが評価値 + 9、
+最上位ビットが「到達可能な局面」の印。
+
+ファイルの先頭はヘッダ（マジック、バージョン、局面数、データの CRC32）。
+読み込むときにチェックサムを確かめ、合わなければ使わない。
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import zlib
+
+from marubatsu.board import EMPTY_TABLE, FULL_MASK, LINE_TABLE
+
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solved_3x3.bin")
+
+MAGIC = b"MBSV"
+VERSION = 1
+ENTRY_COUNT = 3 ** 9
+
+# マジック, バージョン, 局面数, データの CRC32（リトルエンディアン）
+HEADER = struct.Struct("<4sHII")
+ENTRY = struct.Struct("<H")
+
+_MOVES_MASK = 0x1FF
+_VALUE_SHIFT = 9
+_VALUE_OFFSET = 9
+_REACHABLE = 0x8000
+
+# POWERS[cell] -> 3 ** cell
+POWERS = tuple(3 ** cell for cell in range(9))
+
+
+def encode(own, other):
+    """(手番側のビット, 相手のビット) -> 3進数の局面番号"""
+    index = 0
+    for cell in range(9):
+        if own >> cell & 1:
+            index += POWERS[cell]
+        elif other >> cell & 1:
+            index += 2 * POWERS[cell]
+    return index
+
+
+def _pack(value, moves):
+    mask = 0
+    for cell in moves:
+        mask |= 1 << cell
+    return _REACHABLE | (value + _VALUE_OFFSET) << _VALUE_SHIFT | mask
+
+
+def build_entries():
+    """到達可能な全局面を解き、局面番号順の値のリストを返す"""
+    from marubatsu import solver
+
+    entries = [0] * ENTRY_COUNT
+    seen = set()
+    stack = [(0, 0)]
+    while stack:
+        own, other = stack.pop()
+        index = encode(own, other)
+        if index in seen:
+            continue
+        seen.add(index)
+        value, moves = solver.solve(own, other)
+        entries[index] = _pack(value, moves)
+        occupied = own | other
+        if LINE_TABLE[other] >= 0 or occupied == FULL_MASK:
+            continue
+        for cell in EMPTY_TABLE[occupied]:
+            stack.append((other, own | 1 << cell))
+    return entries
+
+
+def write_book(path=BOOK_PATH):
+    """表を作ってファイルに書き、到達可能な局面の数を返す"""
+    entries = build_entries()
+    data = struct.pack(f"<{ENTRY_COUNT}H", *entries)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, ENTRY_COUNT, zlib.crc32(data)))
+        f.write(data)
+    return sum(1 for entry in entries if entry & _REACHABLE)
+
+
+class SolvedBook:
+    """メモリマップした解の表"""
+
+    def __init__(self, path=BOOK_PATH):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._validate()
+        except ValueError:
+            self._map.close()
+            raise
+
+    def _validate(self):
+        if len(self._map) != HEADER.size + ENTRY_COUNT * ENTRY.size:
+            raise ValueError("ファイルの大きさが合いません")
+        magic, version, count, checksum = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION or count != ENTRY_COUNT:
+            raise ValueError("形式が違います")
+        if zlib.crc32(self._map[HEADER.size:]) != checksum:
+            raise ValueError("チェックサムが合いません")
+
+    def _entry(self, own, other):
+        entry = ENTRY.unpack_from(self._map, HEADER.size + encode(own, other) * ENTRY.size)[0]
+        if not entry & _REACHABLE:
+            raise KeyError((own, other))
+        return entry
+
+    def lookup(self, own, other):
+        """手番側から見た (評価値, 最善手のタプル)"""
+        entry = self._entry(own, other)
+        mask = entry & _MOVES_MASK
+        moves = tuple(cell for cell in range(9) if mask >> cell & 1)
+        return (entry >> _VALUE_SHIFT & 0x1F) - _VALUE_OFFSET, moves
+
+    def close(self):
+        self._map.close()
+
+
+# 共有の表（False: 読み込みに失敗した）
+_book = None
+
+
+def get_book():
+    """共有の表（初回呼び出し時に読み込む。使えなければ None）"""
+    global _book
+    if _book is None:
+        try:
+            _book = SolvedBook()
+        except (OSError, ValueError) as e:
+            print(f"解の表を読み込めませんでした: {BOOK_PATH}")
+            print(e)
+            _book = False
+    return _book or None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="maru_batsu_game build-book",
+                                     description="3×3の全局面を解いた表をファイルに書く")
+    parser.add_argument("--output", default=BOOK_PATH, help="出力するファイル")
+    args = parser.parse_args(argv)
+
+    reachable = write_book(args.output)
+    size = os.path.getsize(args.output)
+    print(f"Solved {reachable} positions -> {args.output} ({size} bytes)")
+    return 0
@@ -0,0 +1,80 @@
+"""ネットワーク対戦サーバーへの接続（Pygameに依存しない）
+
+受信は別スレッドで行い、届いた行を単語のリストにしてキューにためる。
+ゲームループは毎フレーム poll() で溜まったメッセージを取り出すだけなので、
+通信を待って止まることはない。notify を設定すると、届くたびに受信スレッドから
+呼ぶ（入力を待って眠っているゲームループを起こすのに使う）。
+"""
+
+import queue
+import socket
+import threading
+
+# 接続が切れたときにキューに入れるメッセージ
+CLOSED = ["CLOSED"]
+
+
+def parse_address(text, default_port):
+    """"host:port" または "host" を (host, port) にする"""
+    host, _, port = text.rpartition(":")
+    if not host:
+        return text, default_port
+    if not port.isdigit():
+        raise ValueError(f"ポート番号が正しくありません: {text}")
+    return host, int(port)
+
+
+class LineClient:
+    """1行1コマンドでサーバーと話す接続"""
+
+    def __init__(self, host, port, timeout=5.0):
+        self.sock = socket.create_connection((host, port), timeout)
+        self.sock.settimeout(None)
+        self.connected = True
+        self.messages = queue.SimpleQueue()
+        self.notify = None  # メッセージが届くたびに受信スレッドから呼ぶ関数
+        self._thread = threading.Thread(target=self._receive, name="net-client", daemon=True)
+        self._thread.start()
+
+    def _receive(self):
+        try:
+            with self.sock.makefile("rb") as f:
+                for line in f:
+                    self.messages.put(line.decode(errors="replace").split())
+                    self._notify()
+        except OSError:
+            pass
+        self.connected = False
+        self.messages.put(CLOSED)
+        self._notify()
+
+    def _notify(self):
+        if self.notify is not None:
+            self.notify()
+
+    def send(self, line):
+        """1行送る（切れていたら何もしない）"""
+        if not self.connected:
+            return
+        try:
+            self.sock.sendall(line.encode() + b"\n")
+        except OSError:
+            self.connected = False
+
+    def poll(self):
+        """届いているメッセージを全て取り出す"""
+        messages = []
+        while True:
+            try:
+                messages.append(self.messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def close(self):
+        self.send("QUIT")
+        self.connected = False
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
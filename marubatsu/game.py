@@ -0,0 +1,443 @@
+"""○×ゲームのルールとCPUの手（Pygameに依存しない）"""
+
+import collections
+import random
+import time
+
+from marubatsu.board import PLAYER_MARU, PLAYER_BATSU, make_board, opponent
+from marubatsu.mcts import MCTSPlayer, decisive_move
+from marubatsu.policies import CPU_LEVELS, MCTS_PLAYOUTS, get_policy, heuristic_policy
+from marubatsu.records import GameRecord, MODE_CPU, MODE_HUMAN
+from marubatsu.search import iterative_deepening
+
+
+# ゲームの状態
+class GameState:
+    TITLE = 0
+    PLAYING = 1
+    GAME_OVER = 2
+
+
+# 選べる盤の種類 (盤の大きさ, 勝ちに必要な並び数)
+VARIANTS = ((3, 3), (5, 4), (15, 5))
+
+# MCTSのCPUが update() 1回あたり（ワーカーでは結果を報告する間隔）に考える時間（ミリ秒）
+THINK_SLICE = 8
+
+
+GameSnapshot = collections.namedtuple(
+    "GameSnapshot",
+    "variant board state current_player winner winning_line moves undone_moves first_player "
+    "cpu_thinking cpu_elapsed game_seed rng_draws")
+GameSnapshot.__doc__ = """ある時点のゲームの状態（MaruBatsuGame.restore() で戻せる）
+
+board は盤の state()、moves は打ったマスのタプル、undone_moves は待ったで戻した
+マスのタプル（やり直す順の逆）、cpu_elapsed はCPUが考え始めてからの
+時間（ミリ秒）。ゲームの乱数は game_seed で初め直してから rng_draws 個引いた状態に戻す。
+どれも変更できない値なので、盤の大きさによらず一定の時間で取り出せ、コピーせずに共有できる。
+"""
+
+
+class _GameRandom(random.Random):
+    """引いた数（32ビット単位）を数える乱数（種と引いた数だけで今の状態を作り直せる）"""
+
+    def seed(self, a=None, version=2):
+        super().seed(a, version)
+        self.draws = 0
+
+    def getrandbits(self, k):
+        self.draws += (k + 31) // 32
+        return super().getrandbits(k)
+
+    def random(self):
+        self.draws += 2
+        return super().random()
+
+    def skip(self, draws):
+        """draws 個引いて捨てる"""
+        for _ in range(draws):
+            self.getrandbits(32)
+
+
+def _monotonic_ticks():
+    """経過時間（ミリ秒）"""
+    return int(time.monotonic() * 1000)
+
+
+# ゲームクラス
+class MaruBatsuGame:
+    def __init__(self, get_ticks=_monotonic_ticks, size=3, win_length=3, search_worker=None,
+                 recorder=None, seed=None):
+        self.get_ticks = get_ticks  # 現在時刻（ミリ秒）を返す関数
+        # このゲーム専用の乱数（先手後手とCPUの手に使う。seed が同じなら同じ並び）
+        self.rng = _GameRandom(seed)
+        self.game_seed = None  # 今のゲームの乱数の種（reset_game() で決める）
+        self.state = GameState.TITLE
+        self.board = make_board(size, win_length)
+        self.current_player = PLAYER_MARU
+        self.winner = None
+        self.winning_line = None  # 揃ったマスのタプル
+        self.vs_cpu = True
+        self.cpu_level = 1  # 1: ランダム, 2: 少し賢い, 3: 完全読み, 4〜6: CPU_LEVELS を参照
+        self.cpu_thinking = False  # CPUが考え中かどうか
+        self.cpu_think_start_time = 0  # CPUが考え始めた時間
+        self.cpu_think_duration = 1000  # CPUが考える時間（ミリ秒）
+        self.mcts = None  # MCTSのCPU（必要になったときに作る）
+        # 渡されたらCPUの探索を別スレッドで行う（None なら update() の中で打つ）
+        self.search_worker = search_worker
+        self.cpu_task = None  # 実行中の探索
+        self.moves = []  # このゲームで打ったマス（取り出すときはタプルにする）
+        # 待ったで戻したマス（最後の要素が次にやり直す手。新しい手を打つと消える）
+        self.undone_moves = []
+        self.first_player = PLAYER_MARU  # このゲームの先手
+        # 渡されたら終わったゲームを記録する（GameLogWriter。3×3の盤のみ）
+        self.recorder = recorder
+        # 渡されたらCPUが1手を決めるのにかかった時間を記録する（FrameProfiler）
+        self.profiler = None
+        self.cpu_compute_time = 0.0  # 今の手を考えるのに使った時間（update() の中で打つとき）
+
+    def set_variant(self, size, win_length):
+        """盤の大きさと勝ちに必要な並び数を変える（次のゲームから）"""
+        self.cancel_cpu()
+        self.board = make_board(size, win_length)
+        self.mcts = None  # 前の盤で育てた木は使えない
+        self.state = GameState.TITLE
+
+    def reset_game(self, seed=None):
+        """ゲームをリセット
+
+        seed を渡すとゲームの乱数をその種で初め直す（省略すると今の乱数から新しい種を引く）。
+        同じ種で同じ手を打てば、先手後手もCPUの手も同じになる（時間で探索を打ち切るCPUは除く）。
+        """
+        self.cancel_cpu()
+        self.board.clear()
+        self.game_seed = self.rng.getrandbits(32) if seed is None else seed
+        self.rng.seed(self.game_seed)
+
+        # CPUとの対戦時は先手後手をランダムに決定
+        if self.vs_cpu:
+            self.current_player = self.rng.choice([PLAYER_MARU, PLAYER_BATSU])
+            # CPUが先手の場合は、CPUの手を打つ準備
+            if self.current_player == PLAYER_BATSU:
+                # 少し待ってからCPUが手を打つ
+                self.cpu_thinking = True
+                self.cpu_think_start_time = self.get_ticks()
+                self.cpu_compute_time = 0.0
+        else:
+            self.current_player = PLAYER_MARU
+
+        self.winner = None
+        self.winning_line = None
+        self.moves = []
+        self.undone_moves = []
+        self.first_player = self.current_player
+        self.state = GameState.PLAYING
+        self.cpu_thinking = self.vs_cpu and self.current_player == PLAYER_BATSU
+
+    def update(self):
+        """ゲーム状態の更新"""
+        # CPUが考え中の場合
+        if self.state == GameState.PLAYING and self.cpu_thinking:
+            if self.search_worker is not None:
+                self.poll_cpu()
+                return
+
+            # MCTSのCPUは考え中の時間を少しずつ使って探索する
+            if self.uses_mcts():
+                start = time.perf_counter()
+                self.mcts_player().think(self.board, self.current_player, budget_ms=THINK_SLICE)
+                self.cpu_compute_time += time.perf_counter() - start
+
+            current_time = self.get_ticks()
+            # 一定時間経過したらCPUの手を打つ
+            if current_time - self.cpu_think_start_time >= self.cpu_think_duration:
+                self.cpu_thinking = False
+                if self.profiler is None:
+                    self.cpu_move()
+                else:
+                    start = time.perf_counter()
+                    self.cpu_move()
+                    self.profiler.record_cpu(
+                        self.cpu_level, self.cpu_compute_time + time.perf_counter() - start)
+
+    def next_update_in(self):
+        """次に update() を呼ぶ必要があるまでの時間（ミリ秒）
+
+        0 なら毎フレーム呼ぶ必要がある。None なら予定はない（入力を待つだけでよい）。
+        """
+        if self.state != GameState.PLAYING or not self.cpu_thinking:
+            return None
+        if self.search_worker is None:
+            if self.uses_mcts():
+                # 考え中の時間を少しずつ使って探索する
+                return 0
+        elif self.cpu_task is None or self.cpu_task.stopped():
+            # 探索を始めるところか、切り上げた探索の結果を待っているところ
+            return 0
+        return max(0, self.cpu_think_start_time + self.cpu_think_duration - self.get_ticks())
+
+    def poll_cpu(self):
+        """ワーカーでの探索を始め、考える時間が過ぎたらその時点の最善手を打つ"""
+        if self.cpu_task is None:
+            # ワーカーにはゲームの種と手数から作った専用の乱数を渡す（ゲームの乱数は引かないので、
+            # 同じ局面に戻して考え直しても同じ手を選び、取り消した探索が動いていても並びは変わらない）
+            rng = random.Random(self.game_seed << 16 | len(self.moves))
+            self.cpu_task = self.search_worker.submit(self.cpu_search, self.board.copy(), self.current_player,
+                                                      rng)
+        if self.get_ticks() - self.cpu_think_start_time < self.cpu_think_duration:
+            return
+        # 探索を切り上げさせ、結果が出るまでは次のフレームでまた見る
+        self.cpu_task.stop()
+        if not self.cpu_task.done():
+            return
+        cell = self.cpu_task.result()
+        if self.profiler is not None:
+            self.profiler.record_cpu(self.cpu_level, self.cpu_task.elapsed)
+        self.cpu_task = None
+        if cell is None:
+            cell = heuristic_policy(self.board, self.current_player, self.rng)
+        self.cpu_thinking = False
+        self.make_move(*self.board.position(cell))
+
+    def cpu_search(self, board, player, rng, should_stop):
+        """CPUの手を探すジェネレータ（だんだん良くなる手を順に yield する）
+
+        ワーカーのスレッドで動くので、乱数はゲームの self.rng ではなく rng を使う。
+        """
+        name = CPU_LEVELS[self.cpu_level]
+        if self.uses_mcts():
+            # すぐに勝てる手・防ぐべき手があれば探索しない
+            move = decisive_move(board, player)
+            if move is not None:
+                yield move
+                return
+            mcts = self.mcts_player()
+            mcts.rng = rng
+            while not should_stop():
+                mcts.think(board, player, budget_ms=THINK_SLICE)
+                move = mcts.current_move(board, player)
+                if move is not None:
+                    yield move
+        elif name == "alphabeta":
+            yield from iterative_deepening(board, player, should_stop, rng=rng)
+        else:
+            yield get_policy(name)(board, player, rng)
+
+    def cancel_cpu(self):
+        """CPUが考え中ならやめさせる（ホームに戻るとき・リスタートのとき）"""
+        if self.cpu_task is not None:
+            self.cpu_task.cancel()
+            self.cpu_task = None
+        self.cpu_thinking = False
+
+    def close(self):
+        """探索のワーカーを止め、記録を書き出す"""
+        self.cancel_cpu()
+        if self.search_worker is not None:
+            self.search_worker.shutdown()
+        if self.recorder is not None:
+            self.recorder.close()
+
+    def make_move(self, row, col):
+        """指定した位置に手を打つ（待ったで戻した手は捨てる）"""
+        cell = self.board.index(row, col)
+        if self.board.is_empty(cell):
+            self.undone_moves.clear()
+            self.play(cell)
+
+    def play(self, cell, record=True):
+        """空きマスに手番のプレイヤーの駒を置き、勝敗と次の手番を決める"""
+        self.board.place(cell, self.current_player)
+        self.moves.append(cell)
+
+        # 勝敗チェック
+        if self.check_winner():
+            self.state = GameState.GAME_OVER
+            if record:
+                self.record_game()
+        elif self.is_board_full():
+            self.state = GameState.GAME_OVER
+            self.winner = 0  # 引き分け
+            if record:
+                self.record_game()
+        else:
+            # プレイヤー交代
+            self.current_player = opponent(self.current_player)
+
+            # CPUの手番（やり直せる手が残っている間は考えずに待つ）
+            if (self.vs_cpu and self.current_player == PLAYER_BATSU and self.state == GameState.PLAYING
+                    and not self.undone_moves):
+                # CPUが考え始める時間を記録
+                self.cpu_thinking = True
+                self.cpu_think_start_time = self.get_ticks()
+                self.cpu_compute_time = 0.0
+
+    def can_undo(self):
+        """待ったできる手があるか"""
+        return self.state != GameState.TITLE and bool(self.moves)
+
+    def can_redo(self):
+        """やり直せる手があるか"""
+        return self.state != GameState.TITLE and bool(self.undone_moves)
+
+    def undo(self):
+        """最後の手を1つ戻す（CPUが考え中ならやめさせる）。戻したら True
+
+        盤からその駒を取り除き、打つ前の手番に戻す。打つ前の局面ではまだ勝負が
+        ついていなかったので、勝者と勝利ラインは消すだけでよい。
+        """
+        if not self.can_undo():
+            return False
+        self.cancel_cpu()
+        cell = self.moves.pop()
+        self.current_player = self.board.get(*self.board.position(cell))
+        self.board.remove(cell)
+        self.undone_moves.append(cell)
+        self.winner = None
+        self.winning_line = None
+        self.state = GameState.PLAYING
+        return True
+
+    def redo(self):
+        """待ったで戻した手を1つ打ち直す。打ち直したら True
+
+        やり直せる手がなくなったところでCPUの番なら、CPUが考え始める。
+        """
+        if not self.can_redo():
+            return False
+        self.cancel_cpu()
+        cell = self.undone_moves.pop()
+        # 打ち直して終わったゲームは記録済み
+        self.play(cell, record=False)
+        return True
+
+    def take_back(self):
+        """待った（CPU戦ではCPUの手もあわせて戻し、人の番にする）。戻したら True"""
+        if not self.vs_cpu:
+            return self.undo()
+        # 人の手が1つもなければ戻さない（CPUが先手なら最初の1手はCPUの手）
+        if len(self.moves) <= (self.first_player == PLAYER_BATSU):
+            return False
+        while self.undo() and self.current_player != PLAYER_MARU:
+            pass
+        return True
+
+    def redo_turn(self):
+        """take_back() で戻した手を打ち直す（CPU戦では人の番になるまで）。打ち直したら True"""
+        if not self.redo():
+            return False
+        while self.vs_cpu and self.current_player != PLAYER_MARU and self.state == GameState.PLAYING:
+            if not self.redo():
+                break
+        return True
+
+    def seek(self, index):
+        """打った手が index 手になるまで戻すかやり直す"""
+        while len(self.moves) > index and self.undo():
+            pass
+        while len(self.moves) < index and self.redo():
+            pass
+
+    def uses_mcts(self):
+        """現在のCPUがMCTSで打つか（「最強」は3×3以外の盤ではMCTSになる）"""
+        name = CPU_LEVELS[self.cpu_level]
+        if name == "perfect":
+            return (self.board.size, self.board.win_length) != (3, 3)
+        return name == "mcts"
+
+    def mcts_player(self):
+        """このゲーム用のMCTSのCPU（ゲームをまたいで部分木を使い回す）
+
+        時間で探索を打ち切るので、ゲームの乱数とは別の乱数を使う。
+        """
+        if self.mcts is None:
+            self.mcts = MCTSPlayer()
+        return self.mcts
+
+    def cpu_move(self):
+        """CPUの手を決定（現在の手番のプレイヤーとして打つ）"""
+        if self.board.is_full():
+            return
+        if self.uses_mcts():
+            # 考え中に育てた木から選ぶ（考える時間がなかったときは回数で探索する）
+            cell = self.mcts_player().best_move(self.board, self.current_player, min_playouts=MCTS_PLAYOUTS)
+            self.make_move(*self.board.position(cell))
+            return
+        policy = get_policy(CPU_LEVELS[self.cpu_level])
+        cell = policy(self.board, self.current_player, self.rng)
+        self.make_move(*self.board.position(cell))
+
+    def snapshot(self):
+        """今の状態を GameSnapshot として取り出す"""
+        return GameSnapshot(
+            variant=(self.board.size, self.board.win_length),
+            board=self.board.state(),
+            state=self.state,
+            current_player=self.current_player,
+            winner=self.winner,
+            winning_line=self.winning_line,
+            moves=tuple(self.moves),
+            undone_moves=tuple(self.undone_moves),
+            first_player=self.first_player,
+            cpu_thinking=self.cpu_thinking,
+            cpu_elapsed=self.get_ticks() - self.cpu_think_start_time if self.cpu_thinking else 0,
+            game_seed=self.game_seed,
+            rng_draws=self.rng.draws,
+        )
+
+    def restore(self, snapshot):
+        """snapshot() で取り出した状態に戻す
+
+        CPUが考え中だった状態に戻すと、考え始めてから経っていた時間の続きから考え直す。
+        最初のゲームを始める前の状態に戻したときは、ゲームの乱数はそのまま使い続ける。
+        """
+        self.cancel_cpu()
+        self.mcts = None  # 戻した局面とは別の流れで育てた木は捨てる
+        if (self.board.size, self.board.win_length) != snapshot.variant:
+            self.board = make_board(*snapshot.variant)
+        self.board.restore(snapshot.board)
+        self.state = snapshot.state
+        self.current_player = snapshot.current_player
+        self.winner = snapshot.winner
+        self.winning_line = snapshot.winning_line
+        self.moves = list(snapshot.moves)
+        self.undone_moves = list(snapshot.undone_moves)
+        self.first_player = snapshot.first_player
+        self.cpu_thinking = snapshot.cpu_thinking
+        self.cpu_think_start_time = self.get_ticks() - snapshot.cpu_elapsed
+        self.cpu_compute_time = 0.0
+        if snapshot.game_seed is not None:
+            self.game_seed = snapshot.game_seed
+            self.rng.seed(snapshot.game_seed)
+            self.rng.skip(snapshot.rng_draws)
+
+    def game_record(self):
+        """終わったゲームの記録"""
+        return GameRecord(
+            timestamp=int(time.time()),
+            mode=MODE_CPU if self.vs_cpu else MODE_HUMAN,
+            cpu_level=self.cpu_level if self.vs_cpu else 0,
+            maru_level=0,
+            first_player=self.first_player,
+            winner=self.winner,
+            moves=tuple(self.moves),
+        )
+
+    def record_game(self):
+        """記録係があれば終わったゲームを記録する（3×3の盤のみ）"""
+        if self.recorder is not None and (self.board.size, self.board.win_length) == (3, 3):
+            self.recorder.write(self.game_record())
+
+    def check_winner(self, set_winning_line=True):
+        """勝者をチェック"""
+        cells = self.board.winning_cells()
+        if cells is None:
+            return False
+        if set_winning_line:
+            self.winner = self.board.winner()
+            self.winning_line = cells
+        return True
+
+    def is_board_full(self):
+        """ボードが埋まっているかチェック"""
+        return self.board.is_full()
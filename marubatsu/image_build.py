@@ -0,0 +1,241 @@
+"""画像の生成（アセットのビルド）
+
+各画像は「生成する関数」と「その引数」で決まる。両方（関数のソースも含む）と
+倍率からハッシュを作ってビルドのキャッシュ（``.build-cache.json``）に記録し、
+キーが変わった画像と消えた画像だけを作り直す。作り直す画像が複数あるときは
+別々のプロセスで並行に生成する。スプライトを作り直したときはアトラスもまとめ直す。
+
+高解像度の画面向けに、倍率を指定すると寸法を拡大して描き直した画像
+（``maru@2x.png`` など）も作る。これもキーが変わらない限り作り直さない。
+
+    python -m maru_batsu_game build-assets              # 古くなった画像だけ作り直す
+    python -m maru_batsu_game build-assets --scale 1 2  # 2倍の画像も作る
+    python -m maru_batsu_game build-assets --force      # 全て作り直す
+"""
+
+import argparse
+import concurrent.futures
+import hashlib
+import inspect
+import json
+import os
+
+import numpy as np
+import pygame
+
+from marubatsu.assets import ASSET_DIR, ATLAS_IMAGE, ATLAS_MANIFEST, SPRITES, pack_atlas
+
+# ビルドのキャッシュ（出力ファイル名 -> キー）
+CACHE_FILE = ".build-cache.json"
+
+# 生成のしかたを変えたら上げる（全ての画像を作り直させる）
+BUILD_VERSION = 1
+
+# 色の定義
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+RED = (255, 0, 0)
+BLUE = (0, 0, 255)
+GREEN = (0, 128, 0)
+LIGHT_BLUE = (173, 216, 230)
+
+# タイトルとボタンに使うフォント（なければ既定のフォント）
+TITLE_FONT = "/System/Library/Fonts/ヒラギノ角ゴシック W6.ttc"
+BUTTON_FONT = "/System/Library/Fonts/ヒラギノ角ゴシック W3.ttc"
+
+
+def _font(path, size):
+    try:
+        return pygame.font.Font(path, size)
+    except (OSError, pygame.error):
+        return pygame.font.SysFont(None, size)
+
+
+def create_background(scale, size, top, bottom):
+    """背景画像（上から下への縦のグラデーション）"""
+    width, height = size[0] * scale, size[1] * scale
+    # 行ごとの色を一度に計算し、全ての列に同じ色を並べる
+    t = np.arange(height) / height
+    top = np.array(top)
+    rows = (top + (np.array(bottom) - top) * t[:, None]).astype(np.uint8)
+    surface = pygame.Surface((width, height))
+    pygame.surfarray.blit_array(surface, np.broadcast_to(rows, (width, height, 3)))
+    return surface
+
+
+def create_grid(scale, size, line_width):
+    """○×ゲームのグリッド"""
+    size *= scale
+    line_width *= scale
+    surface = pygame.Surface((size, size), pygame.SRCALPHA)
+    surface.fill(WHITE)
+
+    # 格子線と外枠
+    pygame.draw.line(surface, BLACK, (size//3, 0), (size//3, size), line_width)
+    pygame.draw.line(surface, BLACK, (2*size//3, 0), (2*size//3, size), line_width)
+    pygame.draw.line(surface, BLACK, (0, size//3), (size, size//3), line_width)
+    pygame.draw.line(surface, BLACK, (0, 2*size//3), (size, 2*size//3), line_width)
+    pygame.draw.rect(surface, BLACK, (0, 0, size, size), line_width)
+    return surface
+
+
+def create_maru(scale, size, margin, line_width, color):
+    """○（マル）"""
+    size *= scale
+    surface = pygame.Surface((size, size), pygame.SRCALPHA)
+    surface.fill((0, 0, 0, 0))
+    pygame.draw.circle(surface, color, (size//2, size//2), size//2 - margin * scale, line_width * scale)
+    return surface
+
+
+def create_batsu(scale, size, margin, line_width, color):
+    """×（バツ）"""
+    size *= scale
+    margin *= scale
+    surface = pygame.Surface((size, size), pygame.SRCALPHA)
+    surface.fill((0, 0, 0, 0))
+    pygame.draw.line(surface, color, (margin, margin), (size-margin, size-margin), line_width * scale)
+    pygame.draw.line(surface, color, (size-margin, margin), (margin, size-margin), line_width * scale)
+    return surface
+
+
+def create_title(scale, size, font_size):
+    """タイトル画像（「○」「×」「ゲーム」を色を変えて並べる）"""
+    width, height = size[0] * scale, size[1] * scale
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    surface.fill((0, 0, 0, 0))
+    font = _font(TITLE_FONT, font_size * scale)
+
+    left = 0
+    for text, color in (("○", BLUE), ("×", RED), ("ゲーム", BLACK)):
+        text_surface = font.render(text, True, color)
+        rect = text_surface.get_rect(midleft=(left, height//2))
+        surface.blit(text_surface, rect)
+        left = rect.right
+    return surface
+
+
+def create_button(scale, size, text, color, font_size, radius, border):
+    """ボタン（角の丸い四角に文字）"""
+    width, height = size[0] * scale, size[1] * scale
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    pygame.draw.rect(surface, color, (0, 0, width, height), border_radius=radius * scale)
+    pygame.draw.rect(surface, BLACK, (0, 0, width, height), border * scale, border_radius=radius * scale)
+
+    text_surface = _font(BUTTON_FONT, font_size * scale).render(text, True, WHITE)
+    surface.blit(text_surface, text_surface.get_rect(center=(width//2, height//2)))
+    return surface
+
+
+# 全ての画像: 名前 -> (生成する関数, 引数)
+# 勝利ラインは画像を使わずに描画する（marubatsu/win_lines.py）
+IMAGES = {
+    "background": (create_background, {"size": (800, 600), "top": LIGHT_BLUE, "bottom": WHITE}),
+    "grid": (create_grid, {"size": 300, "line_width": 5}),
+    "maru": (create_maru, {"size": 80, "margin": 5, "line_width": 5, "color": BLUE}),
+    "batsu": (create_batsu, {"size": 80, "margin": 5, "line_width": 5, "color": RED}),
+    "title": (create_title, {"size": (400, 100), "font_size": 60}),
+    "restart_button": (create_button, {"size": (200, 50), "text": "もう一度プレイ", "color": GREEN,
+                                       "font_size": 24, "radius": 15, "border": 3}),
+}
+
+
+def output_name(name, scale):
+    """画像のファイル名（等倍以外は maru@2x.png のように倍率をつける）"""
+    return f"{name}.png" if scale == 1 else f"{name}@{scale}x.png"
+
+
+def image_key(name, scale):
+    """画像のキー（生成する関数のソース・引数・倍率のハッシュ）"""
+    create, params = IMAGES[name]
+    data = json.dumps({
+        "version": BUILD_VERSION,
+        "source": inspect.getsource(create),
+        "params": params,
+        "scale": scale,
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def load_cache(directory):
+    try:
+        with open(os.path.join(directory, CACHE_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(directory, cache):
+    with open(os.path.join(directory, CACHE_FILE), "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def stale_images(directory, scales, cache, force=False):
+    """作り直す [(名前, 倍率)]（キーが変わったものと、ファイルがないもの）"""
+    stale = []
+    for scale in scales:
+        for name in IMAGES:
+            filename = output_name(name, scale)
+            if (force or cache.get(filename) != image_key(name, scale)
+                    or not os.path.exists(os.path.join(directory, filename))):
+                stale.append((name, scale))
+    return stale
+
+
+def build_image(name, scale, directory):
+    """1枚生成して保存し、(ファイル名, キー) を返す（別のプロセスからも呼ぶ）"""
+    if not pygame.font.get_init():
+        pygame.font.init()
+    create, params = IMAGES[name]
+    filename = output_name(name, scale)
+    pygame.image.save(create(scale, **params), os.path.join(directory, filename))
+    return filename, image_key(name, scale)
+
+
+def build(directory=ASSET_DIR, scales=(1,), force=False, jobs=None):
+    """古くなった画像を作り直し、作り直したファイル名のリストを返す"""
+    cache = load_cache(directory)
+    stale = stale_images(directory, scales, cache, force)
+    built = []
+    if len(stale) == 1 or jobs == 1:
+        results = (build_image(name, scale, directory) for name, scale in stale)
+        for filename, key in results:
+            cache[filename] = key
+            built.append(filename)
+    elif stale:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(build_image, name, scale, directory) for name, scale in stale]
+            for future in futures:
+                filename, key = future.result()
+                cache[filename] = key
+                built.append(filename)
+
+    # スプライトが変わったか、アトラスがなければまとめ直す
+    sprites_changed = any(name in SPRITES and scale == 1 for name, scale in stale)
+    atlas_missing = not all(os.path.exists(os.path.join(directory, filename))
+                            for filename in (ATLAS_IMAGE, ATLAS_MANIFEST))
+    if 1 in scales and (sprites_changed or atlas_missing):
+        pack_atlas(directory)
+        built.append(ATLAS_IMAGE)
+    if stale:
+        save_cache(directory, cache)
+    return built
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="maru_batsu_game build-assets",
+                                     description="画像を生成する（古くなったものだけ）")
+    parser.add_argument("--dir", default=ASSET_DIR, help="画像のディレクトリ")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1], help="作る倍率（例: 1 2）")
+    parser.add_argument("--force", action="store_true", help="キャッシュを無視して全て作り直す")
+    parser.add_argument("--jobs", type=int, default=None, help="並行して生成するプロセス数")
+    args = parser.parse_args(argv)
+    if any(scale < 1 for scale in args.scale):
+        parser.error("倍率は 1 以上にしてください")
+
+    built = build(args.dir, args.scale, args.force, args.jobs)
+    for filename in built:
+        print(f"Generated {filename}")
+    print(f"{len(built)} files rebuilt" if built else "All images are up to date")
+    return 0
@@ -0,0 +1,70 @@
+"""画面の配置（ウィンドウの大きさから計算する）
+
+配置は 800×600 の画面での座標で書いておき、ウィンドウに収まる最大の倍率で
+拡大縮小して中央に置く。グリッドとマスの位置は盤の大きさごとに一度だけ計算し、
+描画とクリックの判定の両方で同じものを使う。
+"""
+
+import pygame
+
+# 配置を書いた画面の大きさ（この大きさのとき倍率 1）
+BASE_WIDTH, BASE_HEIGHT = 800, 600
+
+# グリッドの大きさと中心（倍率 1 のとき）
+BASE_GRID_SIZE = 300
+BASE_GRID_CENTER = (BASE_WIDTH // 2, BASE_HEIGHT // 2)
+
+
+class GridGeometry:
+    """グリッドと各マスの領域（マスの大きさはグリッドの大きさを盤のマス数で割ったもの）"""
+
+    __slots__ = ("board_size", "cell_size", "rect", "cells")
+
+    def __init__(self, center, grid_size, board_size):
+        self.board_size = board_size
+        self.cell_size = grid_size // board_size
+        self.rect = pygame.Rect(0, 0, self.cell_size * board_size, self.cell_size * board_size)
+        self.rect.center = center
+        self.cells = tuple(
+            pygame.Rect(self.rect.x + col * self.cell_size, self.rect.y + row * self.cell_size,
+                        self.cell_size, self.cell_size)
+            for row in range(board_size) for col in range(board_size))
+
+    def cell_at(self, pos):
+        """pos にあるマスの番号（グリッドの外なら None）"""
+        if not self.rect.collidepoint(pos):
+            return None
+        col = (pos[0] - self.rect.x) // self.cell_size
+        row = (pos[1] - self.rect.y) // self.cell_size
+        return row * self.board_size + col
+
+
+class Layout:
+    """ウィンドウの大きさに合わせた座標の変換"""
+
+    def __init__(self, size):
+        self.size = tuple(size)
+        width, height = self.size
+        self.scale = min(width / BASE_WIDTH, height / BASE_HEIGHT)
+        self.origin = ((width - BASE_WIDTH * self.scale) / 2, (height - BASE_HEIGHT * self.scale) / 2)
+        self._grids = {}
+
+    def point(self, x, y):
+        """800×600 の画面での座標 -> ウィンドウの座標"""
+        return (round(self.origin[0] + x * self.scale), round(self.origin[1] + y * self.scale))
+
+    def rect(self, x, y, width, height):
+        """800×600 の画面での矩形 -> ウィンドウの矩形"""
+        return pygame.Rect(self.point(x, y), (round(width * self.scale), round(height * self.scale)))
+
+    def px(self, length):
+        """線の太さや角の丸みなどの長さ（1 以上）"""
+        return max(1, round(length * self.scale))
+
+    def grid(self, board_size):
+        """盤の大きさに合わせたグリッドとマスの位置"""
+        geometry = self._grids.get(board_size)
+        if geometry is None:
+            geometry = GridGeometry(self.point(*BASE_GRID_CENTER), self.px(BASE_GRID_SIZE), board_size)
+            self._grids[board_size] = geometry
+        return geometry
@@ -0,0 +1,140 @@
+"""自己対戦のデータから学習した手の価値の表（3×3の盤）
+
+局面（手番側の駒を 1、相手の駒を 2 とした3進数の番号。book.py と同じ）と手の組ごとに、
+その手を打ったゲームの結果（手番側から見た 1 / 0 / -1）の平均を求めて
+(3**9, 9) の表にする。回転・反転で重なる局面は同じ価値なので、
+学習データは8通りに変換して数える。データの少ない組は 0（引き分け）に寄せる。
+
+打つときは局面の番号で表を1行引き、空きマスのうち価値が最大のものを選ぶ。
+多数の盤面では番号の計算が (N, 9) と (9,) の内積1回、表を引くのも1回で済む。
+
+    python -m maru_batsu_game train --data data/selfplay
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from marubatsu.board import PLAYER_MARU
+from marubatsu.book import ENTRY_COUNT, POWERS
+from marubatsu.selfplay import DATA_DIR, chunk_files, iter_chunks
+from marubatsu.symmetry import INVERSE_PERMUTATIONS, PERMUTATIONS
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "learned_3x3.npz")
+
+# 価値を 0 に寄せる強さ（この回数ぶん引き分けを見たものとして数える）
+PRIOR_GAMES = 2.0
+
+# POWER_VECTOR[cell] -> 3 ** cell（内積で局面の番号を求める）
+POWER_VECTOR = np.array(POWERS, dtype=np.int32)
+
+# TERNARY[bits] -> 9ビットの駒配置の各マスを 3 ** cell にした和
+TERNARY = np.array([sum(POWERS[cell] for cell in range(9) if bits >> cell & 1) for bits in range(512)],
+                   dtype=np.int32)
+
+
+def fit(chunks, prior_games=PRIOR_GAMES):
+    """(局面, 手, 結果) のチャンクから (3**9, 9) の価値の表と、数えた局面数を返す"""
+    sums = np.zeros(ENTRY_COUNT * 9)
+    counts = np.zeros(ENTRY_COUNT * 9)
+    positions = 0
+    for boards, moves, outcomes in chunks:
+        positions += len(moves)
+        for perm, inverse in zip(PERMUTATIONS, INVERSE_PERMUTATIONS):
+            # 変換後のマス d には、変換前のマス inverse[d] の駒が来る
+            index = boards[:, inverse] @ POWER_VECTOR
+            flat = index * 9 + np.take(perm, moves)
+            sums += np.bincount(flat, weights=outcomes, minlength=sums.size)
+            counts += np.bincount(flat, minlength=counts.size)
+    values = sums / (counts + prior_games)
+    return values.reshape(ENTRY_COUNT, 9).astype(np.float32), positions
+
+
+def save_model(values, path=MODEL_PATH):
+    np.savez_compressed(path, values=values)
+
+
+class LearnedModel:
+    """学習した価値の表で手を選ぶ"""
+
+    def __init__(self, values):
+        self.values = values
+
+    def choose(self, board, player, rng):
+        """空きマスのうち価値が最大のもの（同じ価値ならランダム）"""
+        own, other = (board.maru, board.batsu) if player == PLAYER_MARU else (board.batsu, board.maru)
+        row = self.values[TERNARY[own] + 2 * TERNARY[other]]
+        empty = board.empty_cells()
+        best = max(row[cell] for cell in empty)
+        return rng.choice([cell for cell in empty if row[cell] == best])
+
+    def batch_scores(self, digits):
+        """(N, 9) の手番側から見た局面（0 / 1 / 2）-> (N, 9) の各マスの価値"""
+        return self.values[digits @ POWER_VECTOR]
+
+
+_model = None
+_model_loaded = False
+
+
+def get_model():
+    """学習済みの表（ファイルがないか読めなければ None）"""
+    global _model, _model_loaded
+    if not _model_loaded:
+        _model_loaded = True
+        try:
+            with np.load(MODEL_PATH) as data:
+                values = data["values"]
+            if values.shape != (ENTRY_COUNT, 9):
+                raise ValueError(f"表の形が違います: {values.shape}")
+            _model = LearnedModel(values)
+        except (OSError, KeyError, ValueError) as e:
+            print(f"学習済みの表を読み込めません（少し賢い戦略で打ちます）: {e}")
+    return _model
+
+
+def evaluate(games, seed=None):
+    """バッチ対戦で学習した戦略を cpu_level 1・2 と戦わせる
+
+    [(相手, 先手の勝ち, 引き分け, 後手の勝ち, 学習した戦略が先手か)] を返す。
+    """
+    from marubatsu.batch import play_batch
+
+    rows = []
+    for opponent in ("random", "heuristic"):
+        rows.append((opponent,) + play_batch(games, "learned", opponent, seed) + (True,))
+        rows.append((opponent,) + play_batch(games, opponent, "learned", seed) + (False,))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="maru_batsu_game train",
+                                     description="自己対戦のデータから手の価値の表を学習する")
+    parser.add_argument("--data", default=DATA_DIR, help="self-play で作ったデータのディレクトリ")
+    parser.add_argument("--output", default=MODEL_PATH, help="学習した表を書くファイル")
+    parser.add_argument("--prior", type=float, default=PRIOR_GAMES, help="価値を 0 に寄せる強さ")
+    parser.add_argument("--eval-games", type=int, default=10000,
+                        help="学習後に cpu_level 1・2 とバッチ対戦させる回数（0 なら対戦しない）")
+    parser.add_argument("--seed", type=int, default=None, help="対戦の乱数の種")
+    args = parser.parse_args(argv)
+
+    paths = chunk_files(args.data)
+    if not paths:
+        parser.error(f"学習データがありません: {args.data}")
+    start = time.perf_counter()
+    values, positions = fit(iter_chunks(paths), args.prior)
+    save_model(values, args.output)
+    print(f"Fitted {positions} positions from {len(paths)} files in {time.perf_counter() - start:.2f}s "
+          f"-> {args.output}")
+
+    if args.eval_games:
+        global _model, _model_loaded
+        _model, _model_loaded = LearnedModel(values), True
+        for opponent, first, draws, second, learned_first in evaluate(args.eval_games, args.seed):
+            wins, losses = (first, second) if learned_first else (second, first)
+            order = "first" if learned_first else "second"
+            print(f"  learned ({order:6s}) vs {opponent:9s}: win {wins / args.eval_games:6.1%}  "
+                  f"draw {draws / args.eval_games:6.1%}  loss {losses / args.eval_games:6.1%}")
+    return 0
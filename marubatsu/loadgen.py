@@ -0,0 +1,144 @@
+"""ネットワーク対戦サーバーの負荷テスト
+
+多数のクライアントを同時につなぎ、ランダムな手でゲームを繰り返して
+1秒あたりのゲーム数と、MOVE を送ってから自分の手の MOVED が返るまでの
+時間（p50 / p99）を測る。
+
+    python -m maru_batsu_game loadgen --clients 500 --games 20            # 起動中のサーバーに接続
+    python -m maru_batsu_game loadgen --local --mode human --clients 1000  # 同じプロセスでサーバーも起動
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from marubatsu.server import DEFAULT_HOST, DEFAULT_PORT, serve
+
+
+class LoadStats:
+    """全クライアントで共有する集計"""
+
+    def __init__(self, clients):
+        self.active = clients  # まだゲームを続けるクライアントの数
+        self.games = 0
+        self.errors = 0
+        self.latencies = []  # 秒
+
+
+def percentile(values, fraction):
+    """並べた values の fraction（0〜1）の位置の値"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run_client(host, port, games, play_command, stats, rng, wait_for_partner=False):
+    """games 回対戦してから切断する
+
+    wait_for_partner が真なら、相手を待っている間に他のクライアントが
+    全て終わったときも切断する（クライアント同士で対戦するとき）。
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        played = 0
+        while played < games:
+            writer.write(play_command)
+            empty = []
+            mark = None
+            sent_at = None
+            while True:
+                if wait_for_partner and mark is None:
+                    try:
+                        line = await asyncio.wait_for(reader.readline(), 0.1)
+                    except asyncio.TimeoutError:
+                        if stats.active <= 1:
+                            return
+                        continue
+                else:
+                    line = await reader.readline()
+                if not line:
+                    return
+                words = line.split()
+                command = words[0]
+                if command == b"START":
+                    mark = words[2]
+                    size = int(words[3])
+                    empty = list(range(size * size))
+                elif command == b"TURN":
+                    cell = empty[rng.randrange(len(empty))]
+                    sent_at = time.perf_counter()
+                    writer.write(b"MOVE %d\n" % cell)
+                elif command == b"MOVED":
+                    cell = int(words[2])
+                    empty.remove(cell)
+                    if words[1] == mark and sent_at is not None:
+                        stats.latencies.append(time.perf_counter() - sent_at)
+                        sent_at = None
+                elif command == b"END":
+                    played += 1
+                    stats.games += 1
+                    break
+                elif command == b"ERROR":
+                    stats.errors += 1
+        writer.write(b"QUIT\n")
+        await writer.drain()
+    finally:
+        stats.active -= 1
+        writer.close()
+
+
+async def run_load(host, port, clients, games, mode, cpu_level=1, seed=None, local=False):
+    """負荷をかけて (LoadStats, 経過秒) を返す"""
+    server_task = None
+    if local:
+        ready = asyncio.get_running_loop().create_future()
+        server_task = asyncio.create_task(serve(host, 0, ready=ready))
+        _, port = await ready
+
+    if mode == "cpu":
+        play_command = b"PLAY CPU %d\n" % cpu_level
+    else:
+        play_command = b"PLAY HUMAN\n"
+    stats = LoadStats(clients)
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(
+            run_client(host, port, games, play_command, stats, random.Random(rng.random()),
+                       wait_for_partner=mode == "human")
+            for _ in range(clients)))
+    finally:
+        if server_task is not None:
+            server_task.cancel()
+    return stats, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="maru_batsu_game loadgen",
+                                     description="ネットワーク対戦サーバーに負荷をかけて測る")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="サーバーのアドレス")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="サーバーのポート")
+    parser.add_argument("--clients", type=int, default=100, help="同時に接続するクライアント数")
+    parser.add_argument("--games", type=int, default=10, help="1クライアントあたりのゲーム数")
+    parser.add_argument("--mode", choices=("cpu", "human"), default="cpu",
+                        help="CPUと対戦するか、クライアント同士で対戦するか")
+    parser.add_argument("--cpu-level", type=int, default=1, help="CPUと対戦するときの cpu_level")
+    parser.add_argument("--seed", type=int, default=None, help="乱数の種")
+    parser.add_argument("--local", action="store_true", help="同じプロセスでサーバーも起動する")
+    args = parser.parse_args(argv)
+
+    try:
+        stats, elapsed = asyncio.run(run_load(args.host, args.port, args.clients, args.games,
+                                              args.mode, args.cpu_level, args.seed, args.local))
+    except OSError as e:
+        parser.error(f"サーバーに接続できません: {e}")
+    games = stats.games // 2 if args.mode == "human" else stats.games
+    print(f"{games} games, {len(stats.latencies)} moves by {args.clients} clients in {elapsed:.2f}s")
+    print(f"  {games / elapsed if elapsed else 0:.0f} games/s, "
+          f"move latency p50 {percentile(stats.latencies, 0.5) * 1000:.2f}ms "
+          f"p99 {percentile(stats.latencies, 0.99) * 1000:.2f}ms")
+    if stats.errors:
+        print(f"  {stats.errors} errors")
+    return 0
@@ -0,0 +1,236 @@
+"""モンテカルロ木探索（UCT）のCPU
+
+3×3 より大きな盤では全探索ができないので、ランダム（または少し賢い戦略）で
+最後まで打つプレイアウトを繰り返し、勝率の高い手を選ぶ。
+大きな盤では既に置かれた駒の近くだけを候補手にする。
+探索は時間かプレイアウト数で打ち切る。think() を少しずつ何度も呼べば、
+考え中の時間を使って木を育てられる。手を打った後も、実際に進んだ局面の
+部分木を残して次の手番で使い回す。
+"""
+
+import math
+import random
+import time
+
+from marubatsu.board import PLAYER_MARU, candidate_moves, opponent
+from marubatsu.policies import heuristic_policy
+
+
+class Node:
+    """探索木のノード（move を打った直後の局面）"""
+
+    __slots__ = ("move", "parent", "player_just_moved", "children", "untried", "visits", "score")
+
+    def __init__(self, move, parent, player_just_moved, untried):
+        self.move = move
+        self.parent = parent
+        self.player_just_moved = player_just_moved
+        self.children = {}  # マス -> Node
+        self.untried = untried  # まだ展開していない手
+        self.visits = 0
+        self.score = 0.0  # player_just_moved から見た勝ち点（勝ち 1, 引き分け 0.5）
+
+    def select_child(self, exploration):
+        """UCB1 が最大の子を選ぶ"""
+        log_visits = math.log(self.visits)
+        best = None
+        best_value = -1.0
+        for child in self.children.values():
+            value = child.score / child.visits + exploration * math.sqrt(log_visits / child.visits)
+            if value > best_value:
+                best = child
+                best_value = value
+        return best
+
+
+def decisive_move(board, player):
+    """すぐに勝てる手か、相手の勝ちを防ぐ手（なければ None）"""
+    empty_cells = board.empty_cells()
+    for side in (player, opponent(player)):
+        for cell in empty_cells:
+            if board.wins_with(cell, side):
+                return cell
+    return None
+
+
+def _random_rollout(board, player, rng):
+    return rng.choice(board.empty_cells())
+
+
+# プレイアウトで使う戦略
+ROLLOUTS = {
+    "random": _random_rollout,
+    "heuristic": heuristic_policy,
+}
+
+
+class MCTSPlayer:
+    """UCT で手を選ぶCPU"""
+
+    def __init__(self, exploration=1.4, rollout="random", rng=None):
+        self.exploration = exploration
+        self.rollout = ROLLOUTS[rollout]
+        self.rng = rng or random.Random()
+        self.root = None
+        self.root_bits = None  # 根の局面の (盤の大きさ, 並べる数, ○のビット, ×のビット)
+        self.root_player = None  # 根の局面で手番のプレイヤー
+        # 統計（直近の1手と累計）
+        self.move_playouts = 0
+        self.move_seconds = 0.0
+        self.total_playouts = 0
+        self.total_seconds = 0.0
+
+    def _sync(self, board, player):
+        """根を board の局面に合わせる（可能なら部分木を使い回す）"""
+        bits = (board.size, board.win_length, board.maru, board.batsu)
+        if self.root is not None and self.root_bits == bits and self.root_player == player:
+            return
+        node = self.root
+        if node is not None and (self.root_bits[:2] != bits[:2]
+                                 or self.root_bits[2] & ~board.maru
+                                 or self.root_bits[3] & ~board.batsu):
+            # 根の局面から進んだ局面ではない（新しいゲームや盤の変更など）
+            node = None
+        if node is not None:
+            _, _, maru, batsu = self.root_bits
+            to_move = self.root_player
+            # 根の局面から進んだ手を順にたどる
+            while node is not None and (maru, batsu) != bits[2:]:
+                own = board.bits(to_move)
+                placed = own & ~(maru if to_move == PLAYER_MARU else batsu)
+                if not placed or placed & (placed - 1):
+                    node = None
+                    break
+                cell = placed.bit_length() - 1
+                node = node.children.get(cell)
+                if to_move == PLAYER_MARU:
+                    maru |= placed
+                else:
+                    batsu |= placed
+                to_move = opponent(to_move)
+            if node is not None and to_move != player:
+                node = None
+
+        if node is None:
+            node = Node(None, None, opponent(player), candidate_moves(board))
+            self.move_playouts = 0
+            self.move_seconds = 0.0
+        node.parent = None
+        self.root = node
+        self.root_bits = bits
+        self.root_player = player
+
+    def think(self, board, player, budget_ms=None, playouts=None):
+        """時間（ミリ秒）かプレイアウト数の上限まで木を育てる"""
+        self._sync(board, player)
+        if board.winner() or board.is_full():
+            return 0
+        start = time.perf_counter()
+        deadline = start + budget_ms / 1000 if budget_ms is not None else None
+        count = 0
+        while True:
+            self._iterate(board)
+            count += 1
+            if playouts is not None and count >= playouts:
+                break
+            # 時計を見るのは数回に1回
+            if deadline is not None and count & 7 == 0 and time.perf_counter() >= deadline:
+                break
+            if deadline is None and playouts is None:
+                break
+        elapsed = time.perf_counter() - start
+        self.move_playouts += count
+        self.move_seconds += elapsed
+        self.total_playouts += count
+        self.total_seconds += elapsed
+        return count
+
+    def _iterate(self, root_board):
+        """選択・展開・プレイアウト・逆伝播を1回行う"""
+        rng = self.rng
+        board = root_board.copy()
+        node = self.root
+        player = self.root_player
+
+        # 選択
+        while not node.untried and node.children:
+            node = node.select_child(self.exploration)
+            board.place(node.move, player)
+            player = opponent(player)
+
+        # 展開
+        if node.untried and not board.winner():
+            untried = node.untried
+            index = rng.randrange(len(untried))
+            untried[index], untried[-1] = untried[-1], untried[index]
+            move = untried.pop()
+            board.place(move, player)
+            child_untried = [] if board.winner() else candidate_moves(board)
+            child = Node(move, node, player, child_untried)
+            node.children[move] = child
+            node = child
+            player = opponent(player)
+
+        # プレイアウト
+        while not board.winner() and not board.is_full():
+            board.place(self.rollout(board, player, rng), player)
+            player = opponent(player)
+        winner = board.winner()
+
+        # 逆伝播
+        while node is not None:
+            node.visits += 1
+            if winner == node.player_just_moved:
+                node.score += 1.0
+            elif not winner:
+                node.score += 0.5
+            node = node.parent
+
+    def current_move(self, board, player):
+        """今の木で最も多く訪れた手（根は進めない。まだ考えていなければ None）"""
+        self._sync(board, player)
+        if not self.root.children:
+            return None
+        return max(self.root.children.values(), key=lambda child: child.visits).move
+
+    def best_move(self, board, player, min_playouts=1):
+        """最も多く訪れた手を選び、その部分木を次の根にする
+
+        すぐに勝てる手・防ぐべき手があればそれを優先する。
+        """
+        move = decisive_move(board, player)
+        if move is not None:
+            return move
+        self._sync(board, player)
+        if self.root.visits < min_playouts:
+            self.think(board, player, playouts=min_playouts - self.root.visits)
+        child = max(self.root.children.values(), key=lambda child: child.visits)
+        self.root = child
+        self.root.parent = None
+        self.root_player = opponent(player)
+        size, win_length, maru, batsu = self.root_bits
+        if player == PLAYER_MARU:
+            maru |= 1 << child.move
+        else:
+            batsu |= 1 << child.move
+        self.root_bits = (size, win_length, maru, batsu)
+        self.move_playouts = 0
+        self.move_seconds = 0.0
+        return child.move
+
+    def choose(self, board, player, budget_ms=None, playouts=None):
+        """考えてから手を選ぶ（すぐに勝てる手・防ぐべき手があれば探索しない）"""
+        move = decisive_move(board, player)
+        if move is not None:
+            return move
+        self.think(board, player, budget_ms, playouts)
+        return self.best_move(board, player)
+
+    def playouts_per_second(self):
+        """累計のプレイアウト速度"""
+        return self.total_playouts / self.total_seconds if self.total_seconds else 0.0
+
+    def report(self):
+        """統計の文字列"""
+        return (f"MCTS: {self.total_playouts} playouts in {self.total_seconds:.2f}s "
+                f"({self.playouts_per_second():.0f} playouts/s)")
@@ -0,0 +1,146 @@
+"""CPUの戦略（手の選び方）の登録簿
+
+戦略は ``policy(board, player, rng) -> cell`` という関数で、
+player の手番で打つマス番号を返す。空きマスがある盤面でだけ呼ばれる。
+乱数で選ぶときは ordered_empty_cells() の順に数えて選ぶ（同じ種なら、
+盤の空きマスのリストの並びによらず、駒の配置だけで同じ手になる）。
+"""
+
+import time
+
+from marubatsu import solver
+from marubatsu.board import opponent
+from marubatsu.search import iterative_deepening
+
+# 戦略名 -> 戦略の関数
+POLICIES = {}
+
+# 総当たり戦で名前を指定したときだけ対戦させる戦略（1手が重いものと、時間で読みを打ち切るもの）
+SLOW_POLICIES = set()
+
+# cpu_level -> 戦略名
+CPU_LEVELS = {1: "random", 2: "heuristic", 3: "perfect", 4: "mcts", 5: "alphabeta", 6: "learned"}
+
+# 戦略として使うときのMCTSの1手あたりのプレイアウト数
+MCTS_PLAYOUTS = 1000
+
+# 戦略として使うときの反復深化αβ探索の1手あたりの持ち時間（ミリ秒）
+ALPHABETA_BUDGET_MS = 200
+
+
+def register(name, slow=False):
+    """戦略を登録するデコレータ（slow が真なら総当たり戦の既定の顔ぶれに入れない）"""
+    def decorator(policy):
+        if name in POLICIES:
+            raise ValueError(f"戦略 {name!r} は登録済みです")
+        POLICIES[name] = policy
+        if slow:
+            SLOW_POLICIES.add(name)
+        return policy
+    return decorator
+
+
+def default_policies():
+    """総当たり戦で既定で対戦させる戦略の名前"""
+    return [name for name in POLICIES if name not in SLOW_POLICIES]
+
+
+def get_policy(name):
+    """名前から戦略を取り出す"""
+    try:
+        return POLICIES[name]
+    except KeyError:
+        raise ValueError(f"未登録の戦略です: {name!r}（{', '.join(POLICIES)}）") from None
+
+
+@register("random")
+def random_policy(board, player, rng):
+    """ランダム戦略"""
+    return rng.choice(board.ordered_empty_cells())
+
+
+@register("heuristic")
+def heuristic_policy(board, player, rng):
+    """少し賢い戦略
+
+    1. 自分が勝てる手があれば打つ
+    2. 相手が次に勝てる手があればブロック
+    3. 中央を取る
+    4. 角を取る
+    5. それ以外はランダム
+    """
+    empty_cells = board.ordered_empty_cells()
+    for side in (player, opponent(player)):
+        for cell in empty_cells:
+            if board.wins_with(cell, side):
+                return cell
+
+    # 中央を取る
+    size = board.size
+    center = board.index(size // 2, size // 2)
+    if board.is_empty(center):
+        return center
+
+    # 角を取る
+    last = size - 1
+    corners = [cell for cell in (0, last, size * last, size * size - 1) if board.is_empty(cell)]
+    if corners:
+        return rng.choice(corners)
+
+    # それ以外はランダム
+    return rng.choice(empty_cells)
+
+
+@register("perfect")
+def perfect_policy(board, player, rng):
+    """完全読み（置換表を引くだけ）
+
+    置換表は3×3の盤のものなので、それ以外の盤ではMCTSで打つ。
+    """
+    if board.size != 3 or board.win_length != 3:
+        return mcts_policy(board, player, rng)
+    return solver.perfect_move(board, player, rng)
+
+
+# 戦略として呼ばれたときに使い回すMCTSのプレイヤー
+_mcts_player = None
+
+
+# 1手に MCTS_PLAYOUTS 回のプレイアウトをするので、総当たり戦の既定には入れない
+@register("mcts", slow=True)
+def mcts_policy(board, player, rng):
+    """モンテカルロ木探索（MCTS_PLAYOUTS 回のプレイアウト）"""
+    global _mcts_player
+    if _mcts_player is None:
+        from marubatsu.mcts import MCTSPlayer
+        _mcts_player = MCTSPlayer()
+    _mcts_player.rng = rng
+    return _mcts_player.choose(board, player, playouts=MCTS_PLAYOUTS)
+
+
+# 持ち時間で読みを打ち切るので、同じ種でも結果が変わる。総当たり戦の既定には入れない
+@register("alphabeta", slow=True)
+def alphabeta_policy(board, player, rng):
+    """反復深化のαβ探索（ALPHABETA_BUDGET_MS ミリ秒で読み終えた最も深い手）"""
+    deadline = time.perf_counter() + ALPHABETA_BUDGET_MS / 1000
+    move = None
+    for move in iterative_deepening(board, player, lambda: time.perf_counter() >= deadline, rng=rng):
+        pass
+    if move is None:
+        return heuristic_policy(board, player, rng)
+    return move
+
+
+@register("learned")
+def learned_policy(board, player, rng):
+    """自己対戦のデータから学習した価値の表で打つ（marubatsu/learned.py）
+
+    表は3×3の盤のものなので、それ以外の盤と、表がないときは「少し賢い戦略」で打つ。
+    """
+    if board.size != 3 or board.win_length != 3:
+        return heuristic_policy(board, player, rng)
+    from marubatsu.learned import get_model
+    model = get_model()
+    if model is None:
+        return heuristic_policy(board, player, rng)
+    return model.choose(board, player, rng)
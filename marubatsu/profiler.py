@@ -0,0 +1,111 @@
+"""フレーム時間とCPUの思考時間の計測（Pygameに依存しない）
+
+1フレームを「入力待ち」「イベント処理」「更新」「描画」「画面への転送」に分けて時間を測り、
+それぞれ直近 N フレームぶんを固定長のリングバッファに入れておく。
+パーセンタイルは表示・出力するときにだけ計算する。
+計測しないときはプロファイラ自体を作らない（ループは None かどうかを見るだけ）。
+"""
+
+import array
+import sys
+import time
+
+# フレームの区間（計測する順）
+SECTIONS = ("idle", "events", "update", "draw", "flip")
+
+# 記録しておくフレーム数
+DEFAULT_SIZE = 600
+
+# 表示・出力するパーセンタイル
+PERCENTILES = (0.5, 0.95, 0.99)
+
+
+class RingBuffer:
+    """直近 size 個の値を持つ固定長のバッファ"""
+
+    __slots__ = ("values", "index", "count")
+
+    def __init__(self, size):
+        self.values = array.array("d", bytes(8 * size))
+        self.index = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, value):
+        values = self.values
+        values[self.index] = value
+        self.index = (self.index + 1) % len(values)
+        if self.count < len(values):
+            self.count += 1
+
+    def percentiles(self, fractions=PERCENTILES):
+        """fractions（0〜1）の位置の値のタプル（空なら全て 0）"""
+        if not self.count:
+            return tuple(0.0 for _ in fractions)
+        ordered = sorted(self.values[:self.count])
+        last = self.count - 1
+        return tuple(ordered[min(last, int(fraction * self.count))] for fraction in fractions)
+
+    def maximum(self):
+        return max(self.values[:self.count]) if self.count else 0.0
+
+
+class FrameProfiler:
+    """フレームの区間ごとの時間と、cpu_level ごとのCPUの思考時間を記録する"""
+
+    def __init__(self, size=DEFAULT_SIZE, dump_interval=None, stream=None, clock=time.perf_counter):
+        self.size = size
+        self.clock = clock
+        self.frame = RingBuffer(size)  # フレーム全体（待ち時間を含む）
+        self.sections = {name: RingBuffer(size) for name in SECTIONS}
+        self.cpu = {}  # cpu_level -> RingBuffer
+        self.dump_interval = dump_interval  # 秒（None なら出力しない）
+        self.stream = stream or sys.stdout
+        self._frame_start = None
+        self._last = None
+        self._next_dump = None
+
+    def start_frame(self):
+        """フレームの始まり（前のフレームの長さを記録する）"""
+        now = self.clock()
+        if self._frame_start is not None:
+            self.frame.append(now - self._frame_start)
+        self._frame_start = self._last = now
+
+    def mark(self, section):
+        """前の区切りから今までを section の時間として記録する（フレームの途中から測り始めたときは記録しない）"""
+        now = self.clock()
+        if self._last is not None:
+            self.sections[section].append(now - self._last)
+        self._last = now
+
+    def record_cpu(self, level, seconds):
+        """CPUが1手を決めるのにかかった時間を記録する"""
+        buffer = self.cpu.get(level)
+        if buffer is None:
+            buffer = self.cpu[level] = RingBuffer(self.size)
+        buffer.append(seconds)
+
+    def report_lines(self):
+        """パーセンタイルの表（ミリ秒）の行のリスト"""
+        header = "".join(f"p{int(fraction * 100)}".rjust(8) for fraction in PERCENTILES)
+        lines = [f"{'':10s}{header}{'max':>8s}"]
+        rows = [("frame", self.frame)] + list(self.sections.items())
+        rows += [(f"cpu[{level}]", buffer) for level, buffer in sorted(self.cpu.items())]
+        for name, buffer in rows:
+            values = buffer.percentiles() + (buffer.maximum(),)
+            lines.append(f"{name:10s}" + "".join(f"{value * 1000:8.2f}" for value in values))
+        return lines
+
+    def maybe_dump(self):
+        """dump_interval ごとに表を出力する"""
+        if self.dump_interval is None:
+            return
+        now = self.clock()
+        if self._next_dump is None:
+            self._next_dump = now + self.dump_interval
+        elif now >= self._next_dump:
+            self._next_dump = now + self.dump_interval
+            print("\n".join(self.report_lines()), file=self.stream, flush=True)
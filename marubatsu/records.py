@@ -0,0 +1,266 @@
+"""対戦記録（棋譜）のコンパクトなバイナリ形式
+
+3×3のゲーム1局を 12 バイトの固定長レコードにする。
+
+    bits (uint64)       0-35: 打ったマス（1手 4 ビット、最大9手）
+                       36-39: 手数
+                       40-41: モード（0: 対人, 1: CPU戦, 2: CPU同士）
+                       42-44: ×のCPUの cpu_level（CPUでなければ 0）
+                       45-47: ○のCPUの cpu_level（CPU同士のときだけ）
+                          48: 先手（0: ○, 1: ×）
+                       49-50: 勝者（0: 引き分け, 1: ○, 2: ×）
+    timestamp (uint32)  終局した時刻（UNIX 時間の秒）
+
+記録はディレクトリの中のログファイルに追記し、ファイルが大きくなったら
+次のファイルに移る（games-000001.mbr, games-000002.mbr, ...）。
+各ファイルの先頭にはマジックとレコードの大きさを書いたヘッダがある。
+
+    python -m maru_batsu_game replay              # 記録の集計
+    python -m maru_batsu_game replay --game 0     # 1局を再生して表示
+"""
+
+import argparse
+import collections
+import os
+import struct
+
+from marubatsu.board import PLAYER_MARU, PLAYER_BATSU
+
+LOG_DIR = "logs"
+LOG_PREFIX = "games-"
+LOG_SUFFIX = ".mbr"
+
+MAGIC = b"MBGR"
+VERSION = 1
+
+# マジック, バージョン, レコードの大きさ
+HEADER = struct.Struct("<4sHH")
+RECORD = struct.Struct("<QI")
+
+# 1ファイルの大きさの上限（これを超える前に次のファイルに移る）
+MAX_LOG_BYTES = 64 * 1024 * 1024
+
+# 書き込みのバッファの大きさ
+BUFFER_SIZE = 64 * 1024
+
+# 読み込みで一度に読むレコード数
+CHUNK_RECORDS = 4096
+
+# モード
+MODE_HUMAN = 0
+MODE_CPU = 1
+MODE_SELF_PLAY = 2
+MODE_NAMES = {MODE_HUMAN: "対人", MODE_CPU: "CPU戦", MODE_SELF_PLAY: "CPU同士"}
+
+# bits の各フィールドの位置
+MOVE_BITS = 4
+COUNT_SHIFT = 36
+MODE_SHIFT = 40
+CPU_LEVEL_SHIFT = 42
+MARU_LEVEL_SHIFT = 45
+FIRST_SHIFT = 48
+WINNER_SHIFT = 49
+
+GameRecord = collections.namedtuple(
+    "GameRecord", "timestamp mode cpu_level maru_level first_player winner moves")
+GameRecord.__doc__ = "1局の記録（moves は打ったマスのタプル、winner は 0 なら引き分け）"
+
+
+def pack_record(record):
+    """GameRecord -> 12 バイト"""
+    if len(record.moves) > 9:
+        raise ValueError("記録できるのは9手までです")
+    bits = 0
+    for index, cell in enumerate(record.moves):
+        bits |= cell << index * MOVE_BITS
+    bits |= len(record.moves) << COUNT_SHIFT
+    bits |= record.mode << MODE_SHIFT
+    bits |= record.cpu_level << CPU_LEVEL_SHIFT
+    bits |= record.maru_level << MARU_LEVEL_SHIFT
+    bits |= (record.first_player == PLAYER_BATSU) << FIRST_SHIFT
+    bits |= record.winner << WINNER_SHIFT
+    return RECORD.pack(bits, record.timestamp)
+
+
+def unpack_record(bits, timestamp):
+    """(bits, timestamp) -> GameRecord"""
+    count = bits >> COUNT_SHIFT & 0xF
+    moves = tuple(bits >> index * MOVE_BITS & 0xF for index in range(count))
+    return GameRecord(
+        timestamp,
+        bits >> MODE_SHIFT & 0x3,
+        bits >> CPU_LEVEL_SHIFT & 0x7,
+        bits >> MARU_LEVEL_SHIFT & 0x7,
+        PLAYER_BATSU if bits >> FIRST_SHIFT & 1 else PLAYER_MARU,
+        bits >> WINNER_SHIFT & 0x3,
+        moves,
+    )
+
+
+def log_files(directory=LOG_DIR):
+    """ディレクトリの中のログファイルを古い順に返す"""
+    if not os.path.isdir(directory):
+        return []
+    names = sorted(name for name in os.listdir(directory)
+                   if name.startswith(LOG_PREFIX) and name.endswith(LOG_SUFFIX))
+    return [os.path.join(directory, name) for name in names]
+
+
+def _log_path(directory, number):
+    return os.path.join(directory, f"{LOG_PREFIX}{number:06d}{LOG_SUFFIX}")
+
+
+def check_header(data, path):
+    """ファイルの先頭のヘッダを確かめる（合わなければ ValueError）"""
+    if len(data) < HEADER.size:
+        raise ValueError(f"ヘッダがありません: {path}")
+    magic, version, record_size = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+        raise ValueError(f"対戦記録のファイルではありません: {path}")
+
+
+class GameLogWriter:
+    """対戦記録をログファイルに追記する（バッファしてまとめて書く）"""
+
+    def __init__(self, directory=LOG_DIR, max_bytes=MAX_LOG_BYTES, buffer_size=BUFFER_SIZE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.buffer_size = buffer_size
+        self.records = 0  # このライターで書いたレコード数
+        self._file = None
+        self._number = 0
+
+    def _open(self):
+        # 最後のファイルの続きに追記する
+        os.makedirs(self.directory, exist_ok=True)
+        files = log_files(self.directory)
+        self._number = int(os.path.basename(files[-1])[len(LOG_PREFIX):-len(LOG_SUFFIX)]) if files else 1
+        self._file = open(_log_path(self.directory, self._number), "ab", buffering=self.buffer_size)
+        if self._file.tell() == 0:
+            self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        elif self._file.tell() + RECORD.size > self.max_bytes:
+            self._roll()
+
+    def _roll(self):
+        self._file.close()
+        self._number += 1
+        self._file = open(_log_path(self.directory, self._number), "ab", buffering=self.buffer_size)
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+
+    def write(self, record):
+        """1局ぶんの記録を追記する"""
+        if self._file is None:
+            self._open()
+        elif self._file.tell() + RECORD.size > self.max_bytes:
+            self._roll()
+        self._file.write(pack_record(record))
+        self.records += 1
+
+    def flush(self):
+        """バッファの内容をファイルに書き出す"""
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_records(paths=None, chunk_records=CHUNK_RECORDS):
+    """ログファイルの記録を1局ずつ yield する（一度に読むのは chunk_records 件まで）
+
+    paths を省略すると LOG_DIR の全ファイルを読む。
+    書きかけで途中までしかないレコードは読み飛ばす。
+    """
+    if paths is None:
+        paths = log_files()
+    for path in paths:
+        with open(path, "rb") as f:
+            check_header(f.read(HEADER.size), path)
+            while True:
+                data = f.read(RECORD.size * chunk_records)
+                if not data:
+                    break
+                usable = len(data) - len(data) % RECORD.size
+                for bits, timestamp in RECORD.iter_unpack(data[:usable]):
+                    yield unpack_record(bits, timestamp)
+                if usable < len(data):
+                    break
+
+
+def replay(record, game=None):
+    """記録したゲームを MaruBatsuGame で再生し、1手打つごとにゲームを yield する
+
+    game を渡すときは、記録係（recorder）のないゲームにすること。
+    """
+    if game is None:
+        from marubatsu.game import MaruBatsuGame
+        game = MaruBatsuGame()
+    game.set_variant(3, 3)
+    game.vs_cpu = False
+    game.reset_game()
+    game.current_player = record.first_player
+    for cell in record.moves:
+        game.make_move(*game.board.position(cell))
+        yield game
+
+
+def board_text(board):
+    """盤面の文字列（○・×・空きは ・）"""
+    marks = {PLAYER_MARU: "○", PLAYER_BATSU: "×", 0: "・"}
+    lines = []
+    for row in range(board.size):
+        lines.append("".join(marks[board.get(row, col)] for col in range(board.size)))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="maru_batsu_game replay",
+                                     description="対戦記録を集計・再生する")
+    parser.add_argument("--dir", default=LOG_DIR, help="ログファイルのディレクトリ")
+    parser.add_argument("--game", type=int, default=None, help="再生する記録の番号（0から）")
+    args = parser.parse_args(argv)
+
+    paths = log_files(args.dir)
+    if not paths:
+        parser.error(f"対戦記録がありません: {args.dir}")
+
+    if args.game is not None:
+        count = 0
+        for record in read_records(paths):
+            if count == args.game:
+                break
+            count += 1
+        else:
+            parser.error(f"記録は {count} 件しかありません")
+        print(f"{MODE_NAMES[record.mode]} cpu_level={record.cpu_level} "
+              f"先手={'○' if record.first_player == PLAYER_MARU else '×'}")
+        for number, game in enumerate(replay(record), 1):
+            print(f"\n{number}手目")
+            print(board_text(game.board))
+        result = {0: "引き分け", PLAYER_MARU: "○の勝ち", PLAYER_BATSU: "×の勝ち"}[record.winner]
+        print(f"\n{result}")
+        if game.winner != record.winner:
+            print("（再生した結果が記録と一致しません）")
+            return 1
+        return 0
+
+    counts = collections.Counter()
+    total = 0
+    for record in read_records(paths):
+        counts[record.mode, record.winner] += 1
+        total += 1
+    print(f"{total} games in {len(paths)} files")
+    for mode, name in MODE_NAMES.items():
+        games = sum(count for (m, _), count in counts.items() if m == mode)
+        if games:
+            print(f"  {name}: {games} games "
+                  f"(○ {counts[mode, PLAYER_MARU]} / × {counts[mode, PLAYER_BATSU]} / 引き分け {counts[mode, 0]})")
+    return 0
@@ -0,0 +1,100 @@
+"""反復深化のαβ探索（どの大きさの盤でも使える）
+
+深さ1から順に深く読み、読み終えた深さごとにその深さでの最善手を yield する。
+時間切れや中断のときは、最後に yield された手（読み終えた最も深い探索の手）を
+使えばよい。葉の評価は勝ち・負け・不明（0）だけなので、読める深さの範囲で
+確実に勝てる手・負けを避ける手を見つける戦術的な探索になる。
+前の深さで最善だった手から先に調べるので、深くしても枝刈りがよく効く。
+"""
+
+from marubatsu.board import candidate_moves, opponent
+
+_WIN = 1000
+_INF = 10000
+
+# 中断するかどうかを確認する間隔（ノード数）
+CHECK_INTERVAL = 256
+
+
+class SearchCancelled(Exception):
+    """探索が途中で中断された"""
+
+
+class _Search:
+    """1回の反復深化で共有する状態"""
+
+    def __init__(self, board, should_stop, rng):
+        self.board = board
+        self.should_stop = should_stop
+        self.rng = rng
+        self.nodes = 0
+        self.best = {}  # (○のビット, ×のビット) -> 前の深さでの最善手
+
+    def negamax(self, player, depth, alpha, beta):
+        """手番側から見た評価値（早く勝つほど大きい）"""
+        self.nodes += 1
+        if self.nodes % CHECK_INTERVAL == 0 and self.should_stop():
+            raise SearchCancelled
+        board = self.board
+        if board.winner():
+            # 直前の手で相手が勝っている
+            return -(_WIN + depth)
+        if depth == 0 or board.is_full():
+            return 0
+
+        key = (board.maru, board.batsu)
+        moves = candidate_moves(board)
+        hint = self.best.get(key)
+        if hint is None:
+            if self.rng is not None:
+                self.rng.shuffle(moves)
+        else:
+            moves.remove(hint)
+            moves.insert(0, hint)
+
+        other = opponent(player)
+        best_value = -_INF
+        best_move = moves[0]
+        for cell in moves:
+            board.place(cell, player)
+            try:
+                value = -self.negamax(other, depth - 1, -beta, -alpha)
+            finally:
+                board.remove(cell)
+            if value > best_value:
+                best_value = value
+                best_move = cell
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+        self.best[key] = best_move
+        return best_value
+
+
+def iterative_deepening(board, player, should_stop=None, max_depth=None, rng=None):
+    """深さ1から順に読み、読み終えた深さごとに player の最善手を yield する
+
+    should_stop() が真を返すと、読みかけの深さは捨てて終了する。
+    勝ち負けが読み切れたときと、盤が埋まるまで読んだときも終了する。
+    rng を渡すと、同じ評価値の手の中から選ぶ手がばらつく。
+    """
+    board = board.copy()
+    if board.winner() or board.is_full():
+        return
+    should_stop = should_stop or (lambda: False)
+    search = _Search(board, should_stop, rng)
+    limit = len(board.empty_cells())
+    if max_depth is not None:
+        limit = min(limit, max_depth)
+    key = (board.maru, board.batsu)
+    for depth in range(1, limit + 1):
+        if should_stop():
+            return
+        try:
+            value = search.negamax(player, depth, -_INF, _INF)
+        except SearchCancelled:
+            return
+        yield search.best[key]
+        if abs(value) >= _WIN:
+            return
@@ -0,0 +1,154 @@
+"""自己対戦による学習データの生成
+
+登録されたCPU戦略どうしを対戦させ、一定の確率（探索率）でランダムな手を混ぜる。
+打った手ごとに (局面, 手, 結果) を記録し、一定の件数ごとに .npz ファイル
+（selfplay-000001.npz, ...）に書き出す。メモリに持つのは1チャンクぶんだけ。
+
+    python -m maru_batsu_game self-play --games 200000 --out data/selfplay
+
+局面は手番側から見た9マスの値（空き 0、手番側の駒 1、相手の駒 2）、
+結果は手番側から見た値（勝ち 1、引き分け 0、負け -1）。
+"""
+
+import argparse
+import os
+import random
+import time
+
+import numpy as np
+
+from marubatsu.board import PLAYER_MARU, PLAYER_BATSU, Board, opponent
+from marubatsu.policies import POLICIES, get_policy
+
+DATA_DIR = os.path.join("data", "selfplay")
+CHUNK_PREFIX = "selfplay-"
+
+# 1ファイルに入れる局面の数
+CHUNK_POSITIONS = 1 << 16
+
+# 既定で対戦させる戦略と探索率
+DEFAULT_POLICIES = ("random", "heuristic", "perfect")
+DEFAULT_EPSILON = 0.2
+
+# BIT_DIGITS[bits] -> 9ビットの駒配置を 0/1 の9マスにしたもの
+BIT_DIGITS = np.array([[bits >> cell & 1 for cell in range(9)] for bits in range(512)], dtype=np.int8)
+
+
+def chunk_files(directory=DATA_DIR):
+    """ディレクトリの中のデータファイルを古い順に返す"""
+    if not os.path.isdir(directory):
+        return []
+    names = sorted(name for name in os.listdir(directory)
+                   if name.startswith(CHUNK_PREFIX) and name.endswith(".npz"))
+    return [os.path.join(directory, name) for name in names]
+
+
+def iter_chunks(paths):
+    """データファイルを1つずつ読み、(局面, 手, 結果) の配列を yield する"""
+    for path in paths:
+        with np.load(path) as data:
+            yield data["boards"], data["moves"], data["outcomes"]
+
+
+class DatasetWriter:
+    """(局面, 手, 結果) をためて、CHUNK_POSITIONS 件ごとにファイルに書く"""
+
+    def __init__(self, directory=DATA_DIR, chunk_positions=CHUNK_POSITIONS):
+        self.directory = directory
+        self.boards = np.empty((chunk_positions, 9), dtype=np.int8)
+        self.moves = np.empty(chunk_positions, dtype=np.uint8)
+        self.outcomes = np.empty(chunk_positions, dtype=np.int8)
+        self.count = 0  # ためている件数
+        self.positions = 0  # 書いた件数（ためているものも含む）
+        self.files = []
+        os.makedirs(directory, exist_ok=True)
+        # 前に書いたファイルの続きの番号から書く
+        existing = chunk_files(directory)
+        self._number = int(os.path.basename(existing[-1])[len(CHUNK_PREFIX):-4]) if existing else 0
+
+    def add(self, own, other, move, outcome):
+        """手番側の駒 own・相手の駒 other の局面で move に打ち、結果が outcome だった"""
+        self.boards[self.count] = BIT_DIGITS[own] + 2 * BIT_DIGITS[other]
+        self.moves[self.count] = move
+        self.outcomes[self.count] = outcome
+        self.count += 1
+        self.positions += 1
+        if self.count == len(self.moves):
+            self.flush()
+
+    def flush(self):
+        """ためている局面をファイルに書き出す"""
+        if not self.count:
+            return
+        self._number += 1
+        path = os.path.join(self.directory, f"{CHUNK_PREFIX}{self._number:06d}.npz")
+        np.savez(path, boards=self.boards[:self.count], moves=self.moves[:self.count],
+                 outcomes=self.outcomes[:self.count])
+        self.files.append(path)
+        self.count = 0
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def play_game(policies, epsilon, rng):
+    """1ゲーム打ち、([(手番側の駒, 相手の駒, 手, 手番)], 勝者) を返す（勝者 0 は引き分け）
+
+    policies はプレイヤー -> 戦略の辞書。各手は確率 epsilon でランダムに打つ。
+    """
+    board = Board()
+    history = []
+    player = PLAYER_MARU
+    while True:
+        if rng.random() < epsilon:
+            cell = rng.choice(board.empty_cells())
+        else:
+            cell = policies[player](board, player, rng)
+        own, other = (board.maru, board.batsu) if player == PLAYER_MARU else (board.batsu, board.maru)
+        history.append((own, other, cell, player))
+        board.place(cell, player)
+        winner = board.winner()
+        if winner or board.is_full():
+            return history, winner
+        player = opponent(player)
+
+
+def generate(games, writer, names=DEFAULT_POLICIES, epsilon=DEFAULT_EPSILON, seed=None):
+    """games 回自己対戦して writer に書く（各ゲームの○と×の戦略は names から選ぶ）"""
+    rng = random.Random(seed)
+    policies = [get_policy(name) for name in names]
+    for _ in range(games):
+        players = {PLAYER_MARU: rng.choice(policies), PLAYER_BATSU: rng.choice(policies)}
+        history, winner = play_game(players, epsilon, rng)
+        for own, other, cell, player in history:
+            outcome = 0 if not winner else (1 if winner == player else -1)
+            writer.add(own, other, cell, outcome)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="maru_batsu_game self-play",
+                                     description="CPU同士の自己対戦で学習データを作る")
+    parser.add_argument("--games", type=int, default=100000, help="対戦回数")
+    parser.add_argument("--out", default=DATA_DIR, help="データファイルを書くディレクトリ")
+    parser.add_argument("--policies", nargs="+", default=list(DEFAULT_POLICIES), choices=POLICIES,
+                        help="対戦させる戦略（各ゲームの○と×をこの中から選ぶ）")
+    parser.add_argument("--epsilon", type=float, default=DEFAULT_EPSILON, help="ランダムに打つ確率")
+    parser.add_argument("--chunk", type=int, default=CHUNK_POSITIONS, help="1ファイルの局面数")
+    parser.add_argument("--seed", type=int, default=None, help="乱数の種")
+    args = parser.parse_args(argv)
+    if not 0 <= args.epsilon <= 1:
+        parser.error("--epsilon は 0〜1 にしてください")
+
+    start = time.perf_counter()
+    with DatasetWriter(args.out, args.chunk) as writer:
+        generate(args.games, writer, args.policies, args.epsilon, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"{args.games} games, {writer.positions} positions in {len(writer.files)} files "
+          f"({elapsed:.2f}s)")
+    return 0
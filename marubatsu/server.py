@@ -0,0 +1,343 @@
+"""ネットワーク対戦のサーバー（asyncio）
+
+1つのプロセスで多数のゲームを同時に進める。通信は TCP の上の1行1コマンドの
+テキスト（UTF-8、改行区切り）。各ゲームの状態は盤のビット2つと手番だけの
+小さなオブジェクトで持つ。CPUとの対戦もこのサーバーで打つ
+（探索の重いCPUはCPUの数だけのプロセスで考えさせ、イベントループを止めない）。
+
+    python -m maru_batsu_game serve --port 8765
+
+クライアント → サーバー
+
+    PLAY HUMAN [size win_length]      人と対戦する（相手が来るまで待つ）
+    PLAY CPU level [size win_length]  CPUと対戦する
+    MOVE cell                         マス（0 から size*size-1）に打つ
+    LEAVE                             今のゲームを投了する（待っているときは待つのをやめる）
+    QUIT                              切断する
+
+サーバー → クライアント
+
+    WAIT                              対戦相手を待っている
+    START id mark size win_length     ゲーム開始（mark は自分の駒 O か X。O が先手）
+    TURN                              自分の番になった
+    MOVED mark cell                   打たれた手（自分の手も送る）
+    END result [cell ...]             ゲーム終了（result は O, X, DRAW。勝ったときは揃ったマス）
+    ERROR message                     コマンドの誤り
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import os
+import random
+import time
+
+from marubatsu.board import PLAYER_MARU, PLAYER_BATSU, make_board, opponent
+from marubatsu.mcts import MCTSPlayer
+from marubatsu.policies import CPU_LEVELS, MCTS_PLAYOUTS, get_policy
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# 受け付ける盤の大きさの上限
+MAX_SIZE = 15
+
+MARKS = {PLAYER_MARU: "O", PLAYER_BATSU: "X"}
+
+
+class ProtocolError(Exception):
+    """クライアントのコマンドの誤り"""
+
+
+class Session:
+    """1つの接続"""
+
+    __slots__ = ("writer", "match", "player")
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.match = None  # 対戦中のゲーム
+        self.player = None  # そのゲームでの自分の駒
+
+    def send(self, line):
+        self.writer.write(line.encode() + b"\n")
+
+
+class Match:
+    """1つのゲーム（CPUの席は sessions が None）"""
+
+    __slots__ = ("id", "board", "current", "sessions", "cpu_level", "mcts", "cpu_task")
+
+    def __init__(self, match_id, board, sessions, cpu_level=None):
+        self.id = match_id
+        self.board = board
+        self.current = PLAYER_MARU
+        self.sessions = sessions  # (○の接続, ×の接続)
+        self.cpu_level = cpu_level
+        self.mcts = None  # このゲームのMCTSのCPU（探索のたびにプロセスとやり取りする）
+        self.cpu_task = None  # 考え中の重いCPUの手番（asyncio.Task）
+
+    def session(self, player):
+        return self.sessions[player - PLAYER_MARU]
+
+    def broadcast(self, line):
+        for session in self.sessions:
+            if session is not None:
+                session.send(line)
+
+
+def _cheap_cpu(name, board):
+    """イベントループの中で打ってよい軽いCPUか（学習した表は1手に表を1回引くだけ）"""
+    if name in ("random", "heuristic", "learned"):
+        return True
+    return name == "perfect" and (board.size, board.win_length) == (3, 3)
+
+
+def _search(name, board, player, seed, mcts):
+    """重いCPUの手を決めて (マス, MCTSのCPU) を返す（ワーカープロセスで動く）
+
+    mcts を渡すとそのCPUで探索し、育てた木ごと返す（次の手番で部分木を使い回す）。
+    """
+    rng = random.Random(seed)
+    if mcts is not None:
+        mcts.rng = rng
+        return mcts.choose(board, player, playouts=MCTS_PLAYOUTS), mcts
+    return get_policy(name)(board, player, rng), None
+
+
+class GameServer:
+    """対戦の受付と進行"""
+
+    def __init__(self, rng=None, cpu_workers=None):
+        self.rng = rng or random.Random()
+        self.waiting = {}  # (盤の大きさ, 並び数) -> 相手を待っている接続
+        self.matches = {}  # id -> Match
+        self.next_id = 1
+        self.connections = 0
+        self.games_started = 0
+        self.games_finished = 0
+        # 重いCPUの探索を行うプロセス（最初に使うときに作る）
+        self.cpu_workers = cpu_workers or os.cpu_count()
+        self.cpu_executor = None
+
+    async def handle(self, reader, writer):
+        """1つの接続のコマンドを順に処理する"""
+        session = Session(writer)
+        self.connections += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                words = line.decode(errors="replace").split()
+                if words and words[0] == "QUIT":
+                    break
+                try:
+                    await self.dispatch(session, words)
+                except ProtocolError as e:
+                    session.send(f"ERROR {e}")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            self.disconnect(session)
+            writer.close()
+
+    async def dispatch(self, session, words):
+        if not words:
+            raise ProtocolError("empty command")
+        command, args = words[0], words[1:]
+        if command == "PLAY":
+            await self.play(session, args)
+        elif command == "MOVE":
+            if session.match is None:
+                raise ProtocolError("not playing")
+            if len(args) != 1 or not args[0].isdigit():
+                raise ProtocolError("usage: MOVE cell")
+            await self.move(session.match, session.player, int(args[0]))
+        elif command == "LEAVE":
+            if session.match is not None:
+                self.finish(session.match, opponent(session.player))
+            elif not self.leave_queue(session):
+                raise ProtocolError("not playing")
+        else:
+            raise ProtocolError(f"unknown command: {command}")
+
+    async def play(self, session, args):
+        """PLAY HUMAN [size win_length] / PLAY CPU level [size win_length]
+
+        相手を待っている接続が PLAY を送り直したときは、待つのをやめてから新しい申し込みとして扱う。
+        """
+        if session.match is not None:
+            raise ProtocolError("already playing")
+        if not args or args[0] not in ("HUMAN", "CPU"):
+            raise ProtocolError("usage: PLAY HUMAN|CPU ...")
+        numbers = args[1:]
+        if not all(number.isdigit() for number in numbers):
+            raise ProtocolError("arguments must be numbers")
+        numbers = [int(number) for number in numbers]
+
+        cpu_level = None
+        if args[0] == "CPU":
+            if not numbers or numbers[0] not in CPU_LEVELS:
+                raise ProtocolError(f"cpu level must be one of {sorted(CPU_LEVELS)}")
+            cpu_level = numbers.pop(0)
+        if len(numbers) not in (0, 2):
+            raise ProtocolError("usage: size win_length")
+        size, win_length = numbers or (3, 3)
+        if not 1 <= win_length <= size <= MAX_SIZE:
+            raise ProtocolError(f"need 1 <= win_length <= size <= {MAX_SIZE}")
+        variant = (size, win_length)
+
+        # 待ち行列に残ったまま別のゲームを始めると、後から来た相手と二重に対戦させてしまう
+        self.leave_queue(session)
+        if cpu_level is None:
+            opponent = self.waiting.pop(variant, None)
+            if opponent is None:
+                self.waiting[variant] = session
+                session.send("WAIT")
+                return
+            pair = [opponent, session]
+            self.rng.shuffle(pair)
+            match = self.start(variant, tuple(pair))
+        else:
+            human = self.rng.choice((PLAYER_MARU, PLAYER_BATSU))
+            sessions = (session, None) if human == PLAYER_MARU else (None, session)
+            match = self.start(variant, sessions, cpu_level)
+        await self.next_turn(match)
+
+    def start(self, variant, sessions, cpu_level=None):
+        """ゲームを始めて両者に知らせる"""
+        match = Match(self.next_id, make_board(*variant), sessions, cpu_level)
+        self.next_id += 1
+        self.matches[match.id] = match
+        self.games_started += 1
+        for player in (PLAYER_MARU, PLAYER_BATSU):
+            session = match.session(player)
+            if session is not None:
+                session.match = match
+                session.player = player
+                session.send(f"START {match.id} {MARKS[player]} {variant[0]} {variant[1]}")
+        return match
+
+    async def move(self, match, player, cell):
+        """player の手を打つ（手番・マスが正しくなければ ProtocolError）"""
+        if player != match.current:
+            raise ProtocolError("not your turn")
+        board = match.board
+        if not 0 <= cell < board.size * board.size or not board.is_empty(cell):
+            raise ProtocolError(f"illegal move: {cell}")
+        board.place(cell, player)
+        match.broadcast(f"MOVED {MARKS[player]} {cell}")
+
+        if board.winner():
+            self.finish(match, player)
+        elif board.is_full():
+            self.finish(match, 0)
+        else:
+            match.current = opponent(player)
+            await self.next_turn(match)
+
+    async def next_turn(self, match):
+        """次の手番の人に知らせる（CPUの番なら打つ）"""
+        session = match.session(match.current)
+        if session is not None:
+            session.send("TURN")
+            return
+        name = CPU_LEVELS[match.cpu_level]
+        board = match.board
+        if _cheap_cpu(name, board):
+            await self.move(match, match.current, get_policy(name)(board, match.current, self.rng))
+        else:
+            # 考えている間も相手の接続のコマンド（LEAVE など）を受け付ける
+            match.cpu_task = asyncio.create_task(self.cpu_turn(match, name))
+
+    async def cpu_turn(self, match, name):
+        """重いCPUの手をワーカープロセスで考えて打つ"""
+        if name in ("mcts", "perfect") and match.mcts is None:
+            # 3×3以外の「最強」もMCTSで打つ
+            match.mcts = MCTSPlayer()
+        if self.cpu_executor is None:
+            self.cpu_executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.cpu_workers)
+        loop = asyncio.get_running_loop()
+        cell, match.mcts = await loop.run_in_executor(
+            self.cpu_executor, _search, name, match.board.copy(), match.current,
+            self.rng.getrandbits(64), match.mcts)
+        match.cpu_task = None
+        if match.id in self.matches:
+            await self.move(match, match.current, cell)
+
+    def finish(self, match, winner):
+        """ゲームを終えて両者に結果を知らせる（winner が 0 なら引き分け）"""
+        if self.matches.pop(match.id, None) is None:
+            return
+        self.games_finished += 1
+        if match.cpu_task is not None:
+            # まだ始まっていない探索は取り消す
+            match.cpu_task.cancel()
+            match.cpu_task = None
+        if winner:
+            cells = match.board.winning_cells() or ()
+            match.broadcast(" ".join(["END", MARKS[winner]] + [str(cell) for cell in cells]))
+        else:
+            match.broadcast("END DRAW")
+        for session in match.sessions:
+            if session is not None:
+                session.match = None
+                session.player = None
+
+    def leave_queue(self, session):
+        """相手を待っている接続を待ち行列から外す（待っていなければ False）"""
+        for variant, waiting in self.waiting.items():
+            if waiting is session:
+                del self.waiting[variant]
+                return True
+        return False
+
+    def disconnect(self, session):
+        """切断した接続を待ち行列とゲームから外す（対戦中なら相手の勝ち）"""
+        self.leave_queue(session)
+        if session.match is not None:
+            self.finish(session.match, opponent(session.player))
+
+    def close(self):
+        if self.cpu_executor is not None:
+            self.cpu_executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, server=None, ready=None):
+    """サーバーを起動して接続を待ち続ける
+
+    ready（asyncio.Future）を渡すと、待ち受けを始めたときに (GameServer, ポート) を設定する。
+    """
+    server = server or GameServer()
+    listener = await asyncio.start_server(server.handle, host, port)
+    if ready is not None:
+        ready.set_result((server, listener.sockets[0].getsockname()[1]))
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="maru_batsu_game serve",
+                                     description="ネットワーク対戦のサーバーを起動する")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="待ち受けるアドレス")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="待ち受けるポート")
+    parser.add_argument("--cpu-workers", type=int, default=os.cpu_count(),
+                        help="重いCPUの探索に使うプロセス数")
+    args = parser.parse_args(argv)
+
+    server = GameServer(cpu_workers=args.cpu_workers)
+    start = time.perf_counter()
+    print(f"Listening on {args.host}:{args.port}")
+    try:
+        asyncio.run(serve(args.host, args.port, server))
+    except KeyboardInterrupt:
+        pass
+    elapsed = time.perf_counter() - start
+    print(f"{server.games_finished} games finished in {elapsed:.0f}s")
+    return 0
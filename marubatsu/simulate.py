@@ -0,0 +1,115 @@
+"""画面なしでCPU同士を対戦させて勝敗を集計する
+
+    python -m maru_batsu_game simulate --games 1000 --p1 easy --p2 hard
+"""
+
+import argparse
+import time
+
+from marubatsu.board import PLAYER_MARU, PLAYER_BATSU, opponent
+from marubatsu.game import GameState, MaruBatsuGame
+from marubatsu.policies import CPU_LEVELS
+from marubatsu.records import GameLogWriter, MODE_SELF_PLAY
+
+# 難易度の名前 -> cpu_level
+LEVELS = {"easy": 1, "hard": 2, "perfect": 3, "mcts": 4, "alphabeta": 5, "learned": 6}
+
+
+def play_game(game, levels):
+    """1ゲームをCPU同士で最後まで打ち、勝者を返す（0: 引き分け）
+
+    levels はプレイヤー -> cpu_level の辞書。考え中の待ち時間は使わない。
+    """
+    game.vs_cpu = False
+    game.reset_game()
+    while game.state == GameState.PLAYING:
+        game.cpu_level = levels[game.current_player]
+        game.cpu_move()
+    return game.winner
+
+
+def simulate(games, p1_level, p2_level, alternate=False, size=3, win_length=3, game=None,
+             recorder=None):
+    """games回対戦し、p1から見た (勝ち, 引き分け, 負け) を返す
+
+    p1は○で先手。alternate が真なら先手後手を1ゲームごとに入れ替える。
+    size と win_length で盤の大きさと勝ちに必要な並び数を指定する。
+    game を渡すとそのゲームで対戦する（MCTSの統計を後から見るときなど）。
+    recorder（GameLogWriter）を渡すと各ゲームを「CPU同士」として記録する。
+    """
+    if game is None:
+        game = MaruBatsuGame(size=size, win_length=win_length)
+    wins = draws = losses = 0
+    for index in range(games):
+        p1 = PLAYER_BATSU if alternate and index % 2 else PLAYER_MARU
+        p2 = opponent(p1)
+        # ○が常に先手なので、p1が後手のゲームではp1に×を持たせる
+        levels = {p1: p1_level, p2: p2_level}
+        winner = play_game(game, levels)
+        if recorder is not None:
+            recorder.write(game.game_record()._replace(
+                mode=MODE_SELF_PLAY, cpu_level=levels[PLAYER_BATSU], maru_level=levels[PLAYER_MARU]))
+        if winner == 0:
+            draws += 1
+        elif winner == p1:
+            wins += 1
+        else:
+            losses += 1
+    return wins, draws, losses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="maru_batsu_game simulate",
+                                     description="CPU同士の対戦を画面なしで繰り返す")
+    parser.add_argument("--games", type=int, default=1000, help="対戦回数")
+    parser.add_argument("--p1", choices=LEVELS, default="easy", help="プレイヤー1のCPU（通常は先手）")
+    parser.add_argument("--p2", choices=LEVELS, default="hard", help="プレイヤー2のCPU")
+    parser.add_argument("--alternate", action="store_true", help="先手後手を交互に入れ替える")
+    parser.add_argument("--size", type=int, default=3, help="盤の大きさ（N×N）")
+    parser.add_argument("--win-length", type=int, default=3, help="勝ちに必要な並び数")
+    parser.add_argument("--seed", type=int, default=None, help="乱数の種")
+    parser.add_argument("--batch", action="store_true",
+                        help="NumPyのバッチエンジンで全ゲームを同時に進める（easy/hard/learnedのみ）")
+    parser.add_argument("--log", metavar="DIR", default=None,
+                        help="対戦記録をこのディレクトリのログファイルに追記する（3×3のみ）")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.batch:
+        from marubatsu.batch import BATCH_POLICIES, play_batch
+
+        names = [CPU_LEVELS[LEVELS[level]] for level in (args.p1, args.p2)]
+        for name in names:
+            if name not in BATCH_POLICIES:
+                parser.error(f"--batch で使えない戦略です: {name}")
+        if args.alternate:
+            parser.error("--batch と --alternate は同時に使えません")
+        if (args.size, args.win_length) != (3, 3):
+            parser.error("--batch は3×3の盤だけに対応しています")
+        if args.log:
+            parser.error("--batch と --log は同時に使えません")
+        wins, draws, losses = play_batch(args.games, names[0], names[1], args.seed)
+    else:
+        if not 1 <= args.win_length <= args.size:
+            parser.error(f"--win-length は1〜{args.size}にしてください")
+        if args.log and (args.size, args.win_length) != (3, 3):
+            parser.error("--log は3×3の盤だけに対応しています")
+        game = MaruBatsuGame(size=args.size, win_length=args.win_length, seed=args.seed)
+        recorder = GameLogWriter(args.log) if args.log else None
+        try:
+            wins, draws, losses = simulate(args.games, LEVELS[args.p1], LEVELS[args.p2], args.alternate,
+                                           game=game, recorder=recorder)
+        finally:
+            if recorder is not None:
+                recorder.close()
+    elapsed = time.perf_counter() - start
+
+    total = max(args.games, 1)
+    print(f"{args.p1} vs {args.p2}: {args.games} games")
+    print(f"  p1 win : {wins:8d} ({wins / total:6.1%})")
+    print(f"  draw   : {draws:8d} ({draws / total:6.1%})")
+    print(f"  p2 win : {losses:8d} ({losses / total:6.1%})")
+    print(f"  {elapsed:.2f}s ({args.games / elapsed if elapsed else 0:.0f} games/s)")
+    if not args.batch and game.mcts is not None:
+        print(f"  {game.mcts.report()}")
+    return 0
@@ -0,0 +1,129 @@
+"""完全読みのCPU（αβ法付きネガマックス＋置換表）
+
+局面は「手番側の駒」と「相手の駒」の2つのビットで表すので、
+○と×のどちらが手番でも同じ表を使える。さらに回転・反転で
+正規化したキーを使うので、表に入る局面はおよそ1/8になる。
+表は最初に使われたときに一度だけ作り、全ゲームで共有する。
+解の表のファイル（marubatsu.book）があれば、表は作らずにそちらを引く。
+"""
+
+import random
+
+from marubatsu.board import LINE_TABLE, EMPTY_TABLE, FULL_MASK
+from marubatsu.book import get_book
+from marubatsu.symmetry import canonical_key, canonicalize, untransform_cell
+
+# αβ探索用の置換表のフラグ
+_EXACT = 0
+_LOWER = 1
+_UPPER = 2
+
+_INF = 100
+
+# 正規化した (手番側, 相手) のキー -> (評価値, 正規化した盤面での最善手のタプル)
+_table = None
+
+
+def _negamax(own, other, alpha, beta, tt):
+    """手番側から見た評価値（早く勝つほど大きい）"""
+    occupied = own | other
+    if LINE_TABLE[other] >= 0:
+        # 直前に相手が勝っている
+        return -(10 - bin(occupied).count("1"))
+    if occupied == FULL_MASK:
+        return 0
+
+    key = canonical_key(own, other)
+    entry = tt.get(key)
+    alpha_orig = alpha
+    if entry is not None:
+        flag, value = entry
+        if flag == _EXACT:
+            return value
+        if flag == _LOWER:
+            alpha = max(alpha, value)
+        else:
+            beta = min(beta, value)
+        if alpha >= beta:
+            return value
+
+    best = -_INF
+    for cell in EMPTY_TABLE[occupied]:
+        value = -_negamax(other, own | 1 << cell, -beta, -alpha, tt)
+        if value > best:
+            best = value
+            if value > alpha:
+                alpha = value
+                if alpha >= beta:
+                    break
+
+    if best <= alpha_orig:
+        tt[key] = (_UPPER, best)
+    elif best >= beta:
+        tt[key] = (_LOWER, best)
+    else:
+        tt[key] = (_EXACT, best)
+    return best
+
+
+def _build_table():
+    """到達可能な全局面（正規化したもの）の評価値と最善手を求める"""
+    tt = {}
+    table = {}
+    stack = [(0, 0)]
+    while stack:
+        own, other, _ = canonicalize(*stack.pop())
+        key = own << 9 | other
+        if key in table:
+            continue
+        occupied = own | other
+        if LINE_TABLE[other] >= 0 or occupied == FULL_MASK:
+            table[key] = (_negamax(own, other, -_INF, _INF, tt), ())
+            continue
+
+        value = _negamax(own, other, -_INF, _INF, tt)
+        best_moves = []
+        for cell in EMPTY_TABLE[occupied]:
+            child = (other, own | 1 << cell)
+            if -_negamax(child[0], child[1], -_INF, _INF, tt) == value:
+                best_moves.append(cell)
+            stack.append(child)
+        table[key] = (value, tuple(best_moves))
+    return table
+
+
+def get_table():
+    """共有の置換表（初回呼び出し時に作成）"""
+    global _table
+    if _table is None:
+        _table = _build_table()
+    return _table
+
+
+def solve(own, other):
+    """(手番側, 相手) の局面の (評価値, 最善手のタプル) を置換表から求める"""
+    own, other, transform = canonicalize(own, other)
+    value, moves = get_table()[own << 9 | other]
+    return value, tuple(sorted(untransform_cell(cell, transform) for cell in moves))
+
+
+def _lookup(board, player):
+    own = board.bits(player)
+    other = board.occupied ^ own
+    book = get_book()
+    if book is not None:
+        return book.lookup(own, other)
+    return solve(own, other)
+
+
+def best_moves(board, player):
+    """playerの最善手のタプル"""
+    return _lookup(board, player)[1]
+
+
+def perfect_move(board, player, rng=random):
+    """最善手の中から1つ選ぶ（打てる手がなければ None）"""
+    moves = best_moves(board, player)
+    if not moves:
+        return None
+    return rng.choice(moves)
@@ -0,0 +1,83 @@
+"""盤面の対称性（D4群の8通りの変換）による局面の正規化
+
+回転・反転で重なる局面は同じ評価になるので、
+最小のキーになる変換後の局面を代表として使う。
+"""
+
+from marubatsu.board import FULL_MASK
+
+
+def _rotate(cell):
+    # 時計回りに90度回転
+    row, col = divmod(cell, 3)
+    return col * 3 + (2 - row)
+
+
+def _mirror(cell):
+    # 左右反転
+    row, col = divmod(cell, 3)
+    return row * 3 + (2 - col)
+
+
+def _build_permutations():
+    permutations = []
+    for mirrored in (False, True):
+        for turns in range(4):
+            perm = []
+            for cell in range(9):
+                moved = _mirror(cell) if mirrored else cell
+                for _ in range(turns):
+                    moved = _rotate(moved)
+                perm.append(moved)
+            permutations.append(tuple(perm))
+    return tuple(permutations)
+
+
+# PERMUTATIONS[t][cell] -> 変換 t で移った先のマス（t = 0 は恒等変換）
+PERMUTATIONS = _build_permutations()
+
+# INVERSE_PERMUTATIONS[t][cell] -> 変換 t で cell に移ってくる元のマス
+INVERSE_PERMUTATIONS = tuple(
+    tuple(perm.index(cell) for cell in range(9)) for perm in PERMUTATIONS
+)
+
+# BIT_TABLES[t][bits] -> 9ビットの駒配置を変換 t で移したもの
+BIT_TABLES = tuple(
+    tuple(
+        sum(1 << perm[cell] for cell in range(9) if bits >> cell & 1)
+        for bits in range(FULL_MASK + 1)
+    )
+    for perm in PERMUTATIONS
+)
+
+
+def canonicalize(first, second):
+    """2つの駒配置を正規化し (first, second, 適用した変換) を返す
+
+    キー ``first << 9 | second`` が最小になる変換を選ぶ。
+    """
+    best_first, best_second, best_transform = first, second, 0
+    best_key = first << 9 | second
+    for transform in range(1, 8):
+        table = BIT_TABLES[transform]
+        key = table[first] << 9 | table[second]
+        if key < best_key:
+            best_key = key
+            best_first, best_second, best_transform = table[first], table[second], transform
+    return best_first, best_second, best_transform
+
+
+def canonical_key(first, second):
+    """正規化した局面のキー"""
+    first, second, _ = canonicalize(first, second)
+    return first << 9 | second
+
+
+def transform_cell(cell, transform):
+    """元の盤面のマスを変換後の盤面のマスへ移す"""
+    return PERMUTATIONS[transform][cell]
+
+
+def untransform_cell(cell, transform):
+    """変換後の盤面のマスを元の盤面のマスへ戻す"""
+    return INVERSE_PERMUTATIONS[transform][cell]
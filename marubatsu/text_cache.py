@@ -0,0 +1,43 @@
+"""描画済みの文字列サーフェスのキャッシュ"""
+
+from collections import OrderedDict
+
+
+class LabelCache:
+    """(フォント, 文字列, 色, アンチエイリアス) ごとに描画結果を覚えておく
+
+    maxsize を超えたら最も長く使われていないものから捨てる。
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+
+    def __len__(self):
+        return len(self._surfaces)
+
+    def render(self, font, text, color, antialias=True):
+        """font.render と同じ結果を返す（返したサーフェスは書き換えないこと）"""
+        key = (font, text, tuple(color), antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.maxsize:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        """キャッシュを空にする（カウンタはそのまま）"""
+        self._surfaces.clear()
+
+    def stats(self):
+        """ヒット数・ミス数・保持数"""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._surfaces)}
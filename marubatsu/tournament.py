@@ -0,0 +1,139 @@
+"""登録されたCPU戦略の総当たり戦（プロセスプールで並列実行）
+
+    python -m maru_batsu_game tournament --games 100000 --workers 8
+
+各タスクは自分専用の乱数を種から作るので、ワーカー数に関係なく
+同じ種なら同じ結果になる。ワーカーは1ゲームごとの結果ではなく
+勝ち・引き分け・負けの合計だけを返す。
+"""
+
+import argparse
+import concurrent.futures
+import itertools
+import os
+import random
+import time
+
+from marubatsu.board import Board, PLAYER_MARU, PLAYER_BATSU, opponent
+from marubatsu.policies import POLICIES, default_policies, get_policy
+
+# 1タスクで打つゲーム数
+CHUNK_SIZE = 5000
+
+
+def play_games(name1, name2, games, seed):
+    """name1 と name2 を games 回対戦させ、name1 から見た (勝ち, 引き分け, 負け) を返す
+
+    先手は1ゲームごとに入れ替える。
+    """
+    policy1 = get_policy(name1)
+    policy2 = get_policy(name2)
+    rng = random.Random(seed)
+    board = Board()
+    wins = draws = losses = 0
+    for index in range(games):
+        board.clear()
+        # ○が先手。奇数番目のゲームは name1 が後手（×）
+        p1 = PLAYER_BATSU if index & 1 else PLAYER_MARU
+        policies = {p1: policy1, opponent(p1): policy2}
+        player = PLAYER_MARU
+        while True:
+            board.place(policies[player](board, player, rng), player)
+            winner = board.winner()
+            if winner:
+                if winner == p1:
+                    wins += 1
+                else:
+                    losses += 1
+                break
+            if board.is_full():
+                draws += 1
+                break
+            player = opponent(player)
+    return wins, draws, losses
+
+
+def _tasks(names, games, seed):
+    """(戦略1, 戦略2, ゲーム数, 種) のタスクに分割"""
+    tasks = []
+    for name1, name2 in itertools.combinations_with_replacement(names, 2):
+        for chunk_index, start in enumerate(range(0, games, CHUNK_SIZE)):
+            chunk_seed = f"{seed}:{name1}:{name2}:{chunk_index}"
+            tasks.append((name1, name2, min(CHUNK_SIZE, games - start), chunk_seed))
+    return tasks
+
+
+def run_tournament(names, games, seed=0, workers=None):
+    """全ての組み合わせを games 回ずつ対戦させる
+
+    {(戦略1, 戦略2): [勝ち, 引き分け, 負け]} を返す（戦略1から見た数）。
+    workers が 1 ならプロセスを使わずに実行する。
+    """
+    for name in names:
+        get_policy(name)
+    results = {}
+    for name1, name2 in itertools.combinations_with_replacement(names, 2):
+        results[name1, name2] = [0, 0, 0]
+
+    tasks = _tasks(names, games, seed)
+    if workers == 1:
+        for task in tasks:
+            _accumulate(results, task, play_games(*task))
+        return results
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(play_games, *task): task for task in tasks}
+        for future in concurrent.futures.as_completed(futures):
+            _accumulate(results, futures[future], future.result())
+    return results
+
+
+def _accumulate(results, task, counts):
+    totals = results[task[0], task[1]]
+    for index, count in enumerate(counts):
+        totals[index] += count
+
+
+def crosstable(names, results):
+    """行の戦略から見た 勝ち/引き分け/負け 率の表を文字列で返す"""
+    width = max(len(name) for name in names) + 2
+    cell_width = 20
+    lines = [" " * width + "".join(name.center(cell_width) for name in names)]
+    for row in names:
+        cells = []
+        for col in names:
+            if (row, col) in results:
+                wins, draws, losses = results[row, col]
+            else:
+                losses, draws, wins = results[col, row]
+            total = max(wins + draws + losses, 1)
+            cells.append(f"{wins / total:5.1%}/{draws / total:5.1%}/{losses / total:5.1%}".center(cell_width))
+        lines.append(row.ljust(width) + "".join(cells))
+    lines.append("（行の戦略から見た 勝ち/引き分け/負け）")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="maru_batsu_game tournament",
+                                     description="CPU戦略の総当たり戦を並列に行う")
+    parser.add_argument("--policies", nargs="+", default=None,
+                        help=f"対戦させる戦略（既定: {', '.join(default_policies())}。"
+                             f"登録済み: {', '.join(POLICIES)}）")
+    parser.add_argument("--games", type=int, default=10000, help="1組あたりの対戦回数")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="ワーカープロセス数")
+    parser.add_argument("--seed", type=int, default=0, help="乱数の種")
+    args = parser.parse_args(argv)
+
+    names = args.policies or default_policies()
+    try:
+        start = time.perf_counter()
+        results = run_tournament(names, args.games, args.seed, args.workers)
+    except ValueError as e:
+        parser.error(str(e))
+    elapsed = time.perf_counter() - start
+
+    print(crosstable(names, results))
+    total_games = args.games * len(results)
+    print(f"{total_games} games in {elapsed:.2f}s "
+          f"({total_games / elapsed if elapsed else 0:.0f} games/s, {args.workers} workers)")
+    return 0
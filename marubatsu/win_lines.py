@@ -0,0 +1,79 @@
+"""勝利ラインの描画（画像を使わず、揃ったマスから線を描く）
+
+線は端から端へ伸びていくアニメーションができるように、進み具合を
+STEPS 段階に分けて描く。描いたサーフェスはラインの外接矩形の大きさで、
+(マス, 盤の大きさ, マスの大きさ, 段階) ごとにキャッシュする。
+"""
+
+import pygame
+
+# アニメーションの段階数
+STEPS = 15
+
+# キャッシュするサーフェスの上限（超えたら捨てて作り直す）
+MAX_CACHED = 256
+
+
+class WinLineRenderer:
+    """グリッド上の勝利ラインを描く
+
+    線の太さとマスの端からの距離は、マスの大きさの1/10にする
+    （100pxのマスなら太さ10px、端から10px）。
+    """
+
+    def __init__(self, color):
+        self.color = color
+        self._cache = {}
+
+    @staticmethod
+    def width(cell_size):
+        """線の太さ"""
+        return max(2, cell_size // 10)
+
+    def endpoints(self, cells, board_size, cell_size):
+        """グリッド左上を原点とした線の両端"""
+        (row0, col0), (row1, col1) = divmod(cells[0], board_size), divmod(cells[-1], board_size)
+        half = cell_size // 2
+        extend = half - cell_size // 10
+        step_x = (col1 > col0) - (col1 < col0)
+        step_y = (row1 > row0) - (row1 < row0)
+        start = (col0 * cell_size + half - step_x * extend,
+                 row0 * cell_size + half - step_y * extend)
+        end = (col1 * cell_size + half + step_x * extend,
+               row1 * cell_size + half + step_y * extend)
+        return start, end
+
+    def bounds(self, cells, board_size, cell_size):
+        """グリッド左上を原点とした、線全体を含む矩形"""
+        (x0, y0), (x1, y1) = self.endpoints(cells, board_size, cell_size)
+        pad = self.width(cell_size)
+        return pygame.Rect(min(x0, x1) - pad, min(y0, y1) - pad,
+                           abs(x1 - x0) + 2 * pad + 1, abs(y1 - y0) + 2 * pad + 1)
+
+    def step(self, progress):
+        """進み具合（0〜1）を段階に直す"""
+        return max(0, min(STEPS, round(progress * STEPS)))
+
+    def _surface(self, cells, board_size, cell_size, step):
+        key = (cells, board_size, cell_size, step)
+        surface = self._cache.get(key)
+        if surface is None:
+            bounds = self.bounds(cells, board_size, cell_size)
+            surface = pygame.Surface(bounds.size, pygame.SRCALPHA)
+            surface.fill((0, 0, 0, 0))
+            if step:
+                (x0, y0), (x1, y1) = self.endpoints(cells, board_size, cell_size)
+                t = step / STEPS
+                start = (x0 - bounds.x, y0 - bounds.y)
+                end = (x0 + (x1 - x0) * t - bounds.x, y0 + (y1 - y0) * t - bounds.y)
+                pygame.draw.line(surface, self.color, start, end, self.width(cell_size))
+            if len(self._cache) >= MAX_CACHED:
+                self._cache.clear()
+            self._cache[key] = surface
+        return surface
+
+    def draw(self, screen, grid_pos, cells, board_size, cell_size, progress=1.0):
+        """グリッドの左上が grid_pos のときに、cells を貫く勝利ラインを描く"""
+        bounds = self.bounds(cells, board_size, cell_size)
+        screen.blit(self._surface(cells, board_size, cell_size, self.step(progress)),
+                    (grid_pos[0] + bounds.x, grid_pos[1] + bounds.y))
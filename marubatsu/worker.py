@@ -0,0 +1,79 @@
+"""CPUの探索を描画ループとは別のスレッドで進める
+
+探索は「だんだん良くなる手を順に yield するジェネレータ」として渡す
+（反復深化なら深さごと、MCTSなら一定時間ごと）。ワーカーは yield された手を
+「これまでの最善手」として覚えながら進め、止めるよう指示されたら
+その手を Future の結果にする。ゲームループは毎フレーム done() を見るだけで、
+探索を待って止まることはない。
+"""
+
+import concurrent.futures
+import threading
+import time
+
+
+class SearchTask:
+    """実行中の探索（Future と中断の合図）"""
+
+    def __init__(self):
+        self.future = None
+        self.best_move = None  # これまでに見つかった最善手
+        self.iterations = 0  # yield された回数（反復深化なら読み終えた深さ）
+        self.elapsed = 0.0  # ワーカーで探索していた時間（秒）
+        self._stop = threading.Event()
+
+    def stopped(self):
+        """止めるよう指示されたか"""
+        return self._stop.is_set()
+
+    def stop(self):
+        """探索を切り上げ、これまでの最善手を結果にさせる"""
+        self._stop.set()
+
+    def cancel(self):
+        """探索をやめさせる（結果は使わない）"""
+        self._stop.set()
+        self.future.cancel()
+
+    def done(self):
+        """結果が出たか（中断されたときも真）"""
+        return self.future.done()
+
+    def result(self):
+        """見つかった最善手（done() が真になってから呼ぶ）"""
+        return self.future.result()
+
+
+class SearchWorker:
+    """探索を1本のスレッドで順に実行する
+
+    スレッドは1本なので、前の探索（中断したものも含む）が終わってから
+    次の探索が始まる。MCTSの木のように探索をまたいで使うものも安全に共有できる。
+    """
+
+    def __init__(self):
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="cpu-search")
+
+    def submit(self, search, *args):
+        """``search(*args, should_stop)`` が返すジェネレータをワーカーで進める"""
+        task = SearchTask()
+        task.future = self._executor.submit(self._run, task, search, args)
+        return task
+
+    @staticmethod
+    def _run(task, search, args):
+        start = time.perf_counter()
+        try:
+            for move in search(*args, task.stopped):
+                task.best_move = move
+                task.iterations += 1
+                if task.stopped():
+                    break
+        finally:
+            task.elapsed = time.perf_counter() - start
+        return task.best_move
+
+    def shutdown(self):
+        """まだ始まっていない探索を取り消して、スレッドを終わらせる"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
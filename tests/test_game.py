@@ -0,0 +1,114 @@
+"""ゲームの乱数の種・スナップショットのテスト"""
+
+import time
+
+from marubatsu.board import PLAYER_MARU, make_board
+from marubatsu.game import GameState, MaruBatsuGame
+from marubatsu.worker import SearchWorker
+
+
+class Clock:
+    """手で進める時計（ミリ秒）"""
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def _new_game(clock, seed, cpu_level=2, search_worker=None):
+    game = MaruBatsuGame(get_ticks=clock, size=5, win_length=4, seed=seed, search_worker=search_worker)
+    game.cpu_level = cpu_level
+    game.reset_game()
+    return game
+
+
+def _play_out(game, clock, human, until=None):
+    """人の番は human(game) のマスに打ち、CPUの番は考える時間を進めて打たせる
+
+    until を渡すと、打った手がその数になったところで止める。
+    """
+    while game.state == GameState.PLAYING and (until is None or len(game.moves) < until):
+        if game.cpu_thinking:
+            clock.now += game.cpu_think_duration
+            while game.cpu_thinking:
+                game.update()
+                if game.search_worker is not None:
+                    time.sleep(0.001)
+        else:
+            game.make_move(*game.board.position(human(game)))
+    return list(game.moves)
+
+
+def _last_empty(game):
+    # 人は空いているマスのうち番号の最も大きいものに打つ
+    return game.board.ordered_empty_cells()[-1]
+
+
+def test_seed_and_moves_reproduce_game_on_grid_board():
+    for cpu_level in (1, 2):
+        clock = Clock()
+        game = _new_game(clock, seed=3, cpu_level=cpu_level)
+        moves = _play_out(game, clock, _last_empty)
+        human = iter(cell for turn, cell in enumerate(moves)
+                     if (turn % 2 == 0) == (game.first_player == PLAYER_MARU))
+
+        # 種と人の手だけから、CPUの手も含めて同じゲームになる
+        clock = Clock()
+        replay = _new_game(clock, seed=None, cpu_level=cpu_level)
+        replay.reset_game(seed=game.game_seed)
+        assert replay.first_player == game.first_player
+        assert _play_out(replay, clock, lambda _: next(human)) == moves
+
+
+def test_restore_replays_cpu_moves_on_grid_board():
+    clock = Clock()
+    game = _new_game(clock, seed=5, cpu_level=1)
+    _play_out(game, clock, _last_empty, until=6)
+    game.undo()  # 戻した駒は空きマスのリストの最後に並ぶ
+    snapshot = game.snapshot()
+    assert len(snapshot.board) == 4
+    moves = _play_out(game, clock, _last_empty)
+    next_seed = game.rng.getrandbits(32)
+
+    # 空きマスのリストの並びは変わるが、戻した後も同じ手になり、次のゲームの種も同じ
+    for _ in range(2):
+        game.restore(snapshot)
+        assert _play_out(game, clock, _last_empty) == moves
+        assert game.rng.getrandbits(32) == next_seed
+
+
+def test_restore_after_poll_cpu_replays_worker_move():
+    clock = Clock()
+    worker = SearchWorker()
+    try:
+        game = _new_game(clock, seed=9, cpu_level=1, search_worker=worker)
+        if not game.cpu_thinking:
+            game.make_move(2, 2)
+        game.update()  # 探索を始める
+        assert game.cpu_task is not None
+        snapshot = game.snapshot()
+        moves = _play_out(game, clock, _last_empty)
+
+        for _ in range(3):
+            game.restore(snapshot)
+            assert _play_out(game, clock, _last_empty) == moves
+    finally:
+        worker.shutdown()
+
+
+def test_grid_board_restore_rebuilds_empty_cells():
+    board = make_board(5, 4)
+    for cell in (12, 0, 24, 6):
+        board.place(cell, PLAYER_MARU)
+    board.remove(0)
+    state = board.state()
+    board.place(7, PLAYER_MARU)
+
+    board.restore(state)
+    assert sorted(board.empty_cells()) == board.ordered_empty_cells()
+    assert board.ordered_empty_cells() == [cell for cell in range(25) if cell not in (12, 24, 6)]
+    board.place(3, PLAYER_MARU)
+    board.remove(3)
+    assert sorted(board.empty_cells()) == board.ordered_empty_cells()
@@ -0,0 +1,32 @@
+"""MCTSのCPUのテスト"""
+
+import random
+
+from marubatsu.board import PLAYER_MARU, make_board
+from marubatsu.game import MaruBatsuGame
+from marubatsu.mcts import MCTSPlayer
+
+
+def test_think_after_variant_change_starts_new_tree():
+    player = MCTSPlayer(rng=random.Random(0))
+    player.think(make_board(5, 4), PLAYER_MARU, playouts=200)
+
+    # 同じ空の盤（ビットはどちらも 0）でも大きさが違えば木は使い回さない
+    board = make_board(3, 3)
+    player.think(board, PLAYER_MARU, playouts=200)
+    assert player.root.visits == 200
+    assert set(player.root.children) <= set(board.empty_cells())
+    assert board.is_empty(player.best_move(board, PLAYER_MARU))
+
+
+def test_game_drops_tree_on_set_variant():
+    game = MaruBatsuGame(size=5, win_length=4, seed=1)
+    game.cpu_level = 4
+    game.reset_game()
+    game.mcts_player().think(game.board, game.current_player, playouts=100)
+
+    game.set_variant(3, 3)
+    assert game.mcts is None
+    game.reset_game()
+    game.mcts_player().think(game.board, game.current_player, playouts=100)
+    assert set(game.mcts.root.children) <= set(game.board.empty_cells())
@@ -0,0 +1,55 @@
+"""対称性による局面の正規化のテスト"""
+
+import random
+
+from marubatsu.board import EMPTY_TABLE, FULL_MASK, LINE_TABLE
+from marubatsu.solver import solve
+from marubatsu.symmetry import (BIT_TABLES, PERMUTATIONS, canonical_key, canonicalize,
+                                transform_cell, untransform_cell)
+
+
+def _random_position(rng):
+    own = other = 0
+    for turn, cell in enumerate(rng.sample(range(9), rng.randrange(10))):
+        if turn % 2:
+            other |= 1 << cell
+        else:
+            own |= 1 << cell
+    return own, other
+
+
+def test_symmetric_positions_share_key():
+    rng = random.Random(0)
+    for _ in range(200):
+        own, other = _random_position(rng)
+        key = canonical_key(own, other)
+        for table in BIT_TABLES:
+            assert canonical_key(table[own], table[other]) == key
+
+
+def test_canonicalize_returns_applied_transform():
+    rng = random.Random(1)
+    for _ in range(200):
+        own, other = _random_position(rng)
+        first, second, transform = canonicalize(own, other)
+        assert BIT_TABLES[transform][own] == first
+        assert BIT_TABLES[transform][other] == second
+        assert canonical_key(own, other) == first << 9 | second
+
+
+def test_untransform_cell_inverts_transform_cell():
+    for transform in range(len(PERMUTATIONS)):
+        for cell in range(9):
+            assert untransform_cell(transform_cell(cell, transform), transform) == cell
+
+
+def test_solve_moves_are_legal_in_original_orientation():
+    rng = random.Random(2)
+    for _ in range(100):
+        # 決着がつくまで (手番側, 相手) を入れ替えながら打ち、各局面の最善手を確かめる
+        own = other = 0
+        while LINE_TABLE[other] < 0 and own | other != FULL_MASK:
+            empty = EMPTY_TABLE[own | other]
+            _, moves = solve(own, other)
+            assert moves and set(moves) <= set(empty)
+            own, other = other, own | 1 << rng.choice(empty)